@@ -1,10 +1,13 @@
-```python
 import pandas as pd
 import numpy as np
 import joblib
 from binance.client import Client
 from datetime import datetime, timedelta
 from binance_keys import API_KEY, API_SECRET
+from bulk_download import download
+from kline_mmap import has_klines, klines_frame, load_index, write_klines
+from resample import INTERVAL_MS
+from indicators import add_indicators_many
 
 # --- CONFIG ---
 MODEL_PATH = 'intraday_ai_model.joblib'
@@ -39,38 +42,53 @@ def get_top_usdt_symbols(limit=SYMBOL_LIMIT):
 SYMBOLS = get_top_usdt_symbols()
 
 # --- FETCH HISTORICAL DATA ---
+# Klines are cached as memory-mapped arrays (kline_mmap); later runs and
+# parallel workers map the same pages instead of re-downloading and re-parsing.
+def requested_range(start_str, end_str):
+    return pd.Timestamp(start_str).value // 10**6, pd.Timestamp(end_str).value // 10**6
+
+def cache_covers(symbol, interval, start_str, end_str):
+    entry = load_index().get(interval, {}).get(symbol)
+    if not entry or not has_klines(symbol, interval):
+        return False
+    start_ms, end_ms = requested_range(start_str, end_str)
+    # an already-downloaded request covers bars before listing / after delisting too
+    requested = entry.get("requested")
+    if requested and requested[0] <= start_ms and requested[1] >= end_ms:
+        return True
+    if not entry["rows"]:
+        return False
+    return entry["start"] <= start_ms and entry["end"] >= end_ms - INTERVAL_MS[interval]
+
 def fetch_klines(symbol, interval, start_str, end_str):
-    klines = client.get_historical_klines(symbol, interval, start_str, end_str)
-    df = pd.DataFrame(klines, columns=[
-        'time','open','high','low','close','volume',
-        'close_time','qav','trades','tbv','tqv','ignore'
-    ])
-    df['time'] = pd.to_datetime(df['time'], unit='ms')
-    df[['open','high','low','close','volume']] = df[['open','high','low','close','volume']].astype(float)
-    return df.set_index('time')
+    if not cache_covers(symbol, interval, start_str, end_str):
+        klines = client.get_historical_klines(symbol, interval, start_str, end_str)
+        df = pd.DataFrame(klines, columns=[
+            'time','open','high','low','close','volume',
+            'close_time','qav','trades','tbv','tqv','ignore'
+        ])
+        df['time'] = pd.to_datetime(df['time'], unit='ms')
+        df[['open','high','low','close','volume']] = df[['open','high','low','close','volume']].astype(float)
+        write_klines(symbol, interval, df, requested=requested_range(start_str, end_str))
+    return klines_frame(symbol, interval, start_str, end_str).set_index('time')
 
-# --- ADD INDICATORS ---
-def add_indicators(df):
-    df = df.copy()
-    delta = df['close'].diff()
-    gain = delta.clip(lower=0).rolling(14).mean()
-    loss = -delta.clip(upper=0).rolling(14).mean()
-    df['rsi_14'] = 100 - (100/(1 + gain/loss))
-    ema20 = df['close'].ewm(span=20).mean()
-    df['price_above_ema'] = (df['close'] > ema20).astype(int)
-    ema12 = df['close'].ewm(span=12).mean()
-    ema26 = df['close'].ewm(span=26).mean()
-    df['macd'] = ema12 - ema26
-    df['macd_signal'] = df['macd'].ewm(span=9).mean()
-    vol_sma8 = df['volume'].rolling(8).mean()
-    df['volume_spike_%'] = (df['volume'] - vol_sma8) / vol_sma8 * 100
-    return df.dropna()
+def prefetch_klines(symbols, interval, start_str, end_str):
+    # download every uncached symbol concurrently up front; fetch_klines then only maps the cache
+    def store(job, df):
+        if df is not None:
+            write_klines(job[0], interval, df, requested=requested_range(job[2], job[3]))
+    jobs = [(s, interval, start_str, end_str) for s in symbols if not cache_covers(s, interval, start_str, end_str)]
+    if jobs:
+        print(f"Downloading {len(jobs)} symbols...")
+        download(jobs, time_col='time', on_job=store)
 
 # --- RUN BACKTEST ---
+prefetch_klines(SYMBOLS, TIMEFRAME, START_DATE, END_DATE)
+# same indicator definitions as the live bot, computed for every symbol in one pass
+frames = add_indicators_many({sym: fetch_klines(sym, TIMEFRAME, START_DATE, END_DATE) for sym in SYMBOLS}, "backtest")
 for sym in SYMBOLS:
     print(f"Backtesting {sym}...")
-    df = fetch_klines(sym, TIMEFRAME, START_DATE, END_DATE)
-    df = add_indicators(df)
+    df = frames[sym].dropna()
     for i in range(len(df)-1):
         row = df.iloc[i]
         features = pd.DataFrame([{ 
@@ -124,4 +142,3 @@ print(trades)
 print(f"Final equity: ${equity:.2f}")
 trades['date'] = trades['time'].dt.date
 print(trades.groupby('date')['pnl'].sum().reset_index())
-```
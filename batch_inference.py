@@ -0,0 +1,20 @@
+import pandas as pd
+
+# === Batched Inference ===
+# Scores the whole universe with one predict_proba call instead of one
+# single-row DataFrame per symbol.
+
+def missing_features(model, rows):
+    columns = set().union(*(row.keys() for row in rows.values())) if rows else set()
+    return [c for c in getattr(model, "feature_names_in_", []) if c not in columns]
+
+def score_universe(model, rows):
+    # rows: {symbol: {feature: value}} -> {symbol: class probabilities}
+    if not rows:
+        return {}
+    symbols = list(rows)
+    X = pd.DataFrame.from_records([rows[s] for s in symbols])
+    if hasattr(model, "feature_names_in_"):
+        X = X[list(model.feature_names_in_)]
+    proba = model.predict_proba(X)
+    return dict(zip(symbols, proba))
@@ -0,0 +1,137 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from http_client import http, BINANCE_API, WEIGHT_LIMIT_1M
+from resample import INTERVAL_MS
+
+# === Bulk Kline Downloader ===
+# Takes (symbol, interval, start, end) jobs, splits each range into one-request
+# pages and fetches all pages of all jobs on a shared thread pool. Throughput is
+# capped by the http_client weight budget rather than by a serial loop, so deep
+# 5m history for a whole universe downloads at the exchange's rate limit.
+# Pages that fail are retried with backoff; a job with a page that still fails
+# comes back as None so callers never store a silently truncated range.
+KLINE_URL = f"{BINANCE_API}/api/v3/klines"
+KLINE_LIMIT = 1000
+KLINE_WEIGHT = 2
+BULK_WORKERS = 8
+PAGE_RETRIES = 3
+PROGRESS_EVERY = 5.0  # seconds between progress lines
+
+KLINE_COLUMNS = [
+    "open_time", "open", "high", "low", "close", "volume",
+    "close_time", "quote_asset_volume", "number_of_trades",
+    "taker_buy_base", "taker_buy_quote", "ignore",
+]
+
+def to_ms(value):
+    if value is None:
+        return int(time.time() * 1000)
+    if isinstance(value, (int, float)):
+        return int(value)
+    return int(pd.Timestamp(value).value // 10**6)
+
+def klines_to_frame(rows, time_col="timestamp", closed_before=None):
+    df = pd.DataFrame(rows, columns=KLINE_COLUMNS)
+    if closed_before is not None:
+        df = df[df["close_time"] < closed_before]  # drop the still-open bar
+    out = df[["open", "high", "low", "close", "volume"]].astype(float)
+    out.insert(0, time_col, pd.to_datetime(df["open_time"], unit="ms"))
+    return out.sort_values(time_col).reset_index(drop=True)
+
+def pages(interval, start_ms, end_ms):
+    span = INTERVAL_MS[interval] * KLINE_LIMIT
+    return [(s, min(s + span - 1, end_ms)) for s in range(start_ms, end_ms + 1, span)]
+
+def fetch_page(symbol, interval, start_ms, end_ms, retries=PAGE_RETRIES):
+    for attempt in range(retries + 1):
+        try:
+            resp = http.get(KLINE_URL, weight=KLINE_WEIGHT, params={
+                "symbol": symbol, "interval": interval,
+                "startTime": start_ms, "endTime": end_ms, "limit": KLINE_LIMIT,
+            })
+            resp.raise_for_status()
+            return resp.json()
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = min(2 ** attempt, 30)
+            print(f"⚠️ {symbol} {interval} page failed ({e}), retrying in {delay}s")
+            time.sleep(delay)
+
+
+class Progress:
+    def __init__(self, jobs, pages):
+        self.jobs, self.pages = jobs, pages
+        self.jobs_done = self.pages_done = self.bars = self.failed = 0
+        self.started = self.last_print = time.time()
+        self.lock = threading.Lock()
+
+    def page(self, bars):
+        with self.lock:
+            self.pages_done += 1
+            self.bars += bars
+            if time.time() - self.last_print >= PROGRESS_EVERY:
+                self.print()
+
+    def job(self, ok):
+        with self.lock:
+            self.jobs_done += 1
+            self.failed += not ok
+
+    def print(self):
+        self.last_print = time.time()
+        elapsed = max(self.last_print - self.started, 1e-9)
+        print(f"📥 {self.jobs_done}/{self.jobs} jobs, {self.pages_done}/{self.pages} pages, "
+              f"{self.bars:,} bars ({self.bars / elapsed:,.0f} bars/s, "
+              f"{self.pages_done * KLINE_WEIGHT / elapsed * 60:,.0f} weight/min, "
+              f"used {http.used_weight}/{WEIGHT_LIMIT_1M})")
+
+
+def download(jobs, time_col="timestamp", max_workers=BULK_WORKERS, on_job=None):
+    # jobs: [(symbol, interval, start, end)]; start/end are ms, timestamps or date
+    # strings, end None means now. Returns {job: DataFrame of closed bars, or None}.
+    now_ms = int(time.time() * 1000)
+    plan = {job: pages(job[1], to_ms(job[2]), to_ms(job[3])) for job in jobs}
+    progress = Progress(len(plan), sum(len(p) for p in plan.values()))
+    remaining = {job: len(p) for job, p in plan.items()}
+    rows = {job: [] for job in plan}
+    failed = set()
+    results = {}
+    if not plan:
+        return results
+
+    def finish(job):
+        ok = job not in failed
+        results[job] = klines_to_frame(rows.pop(job), time_col, now_ms) if ok else None
+        progress.job(ok)
+        if on_job is not None:
+            on_job(job, results[job])
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(fetch_page, job[0], job[1], s, e): job
+            for job, job_pages in plan.items() for s, e in job_pages
+        }
+        for job in [j for j, n in remaining.items() if n == 0]:
+            finish(job)
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                batch = future.result()
+                rows[job].extend(batch)
+                progress.page(len(batch))
+            except Exception as e:
+                print(f"❌ {job[0]} {job[1]} page failed after {PAGE_RETRIES} retries: {e}")
+                failed.add(job)
+                progress.page(0)
+            remaining[job] -= 1
+            if remaining[job] == 0:
+                finish(job)
+    progress.print()
+    if failed:
+        print(f"❌ {len(failed)} of {len(plan)} jobs failed")
+    return results
@@ -1,5 +1,6 @@
 import pandas as pd
-import os
+from ohlcv_store import load_frame
+from parallel_runner import run_parallel
 
 symbols = [
     "BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "XRPUSDT",
@@ -7,20 +8,24 @@ symbols = [
     "DOGEUSDT", "SHIBUSDT", "PEPEUSDT", "WIFUSDT"
 ]
 
-combined = []
-
-for symbol in symbols:
-    file = f"{symbol}_1h_labeled.csv"
-    if os.path.exists(file):
-        df = pd.read_csv(file, parse_dates=["timestamp"])
+def load_symbol(symbol):
+    df = load_frame(symbol, "1h_labeled")
+    if df is not None:
         df["coin"] = symbol  # add coin tag
-        combined.append(df)
-        print(f"✅ Loaded: {symbol}")
-    else:
-        print(f"❌ Missing: {file}")
+    return df
+
+if __name__ == "__main__":
+    # frames come back in symbol order whatever order the workers finish in
+    combined = []
+    for symbol, df in zip(symbols, run_parallel(load_symbol, symbols, label="coins")):
+        if df is not None:
+            combined.append(df)
+            print(f"✅ Loaded: {symbol}")
+        else:
+            print(f"❌ Missing: {symbol} 1h_labeled")
 
-# Combine all into one DataFrame
-full_df = pd.concat(combined, ignore_index=True)
-full_df.dropna(inplace=True)  # clean NaNs
-full_df.to_csv("intraday_dataset.csv", index=False)
-print("\n📁 Saved combined dataset as intraday_dataset.csv")
+    # Combine all into one DataFrame
+    full_df = pd.concat(combined, ignore_index=True)
+    full_df.dropna(inplace=True)  # clean NaNs
+    full_df.to_csv("intraday_dataset.csv", index=False)
+    print("\n📁 Saved combined dataset as intraday_dataset.csv")
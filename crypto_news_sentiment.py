@@ -1,4 +1,4 @@
-import requests
+from http_client import http
 import pandas as pd
 import time
 
@@ -9,7 +9,7 @@ def fetch_all_news_sentiment(pages=20):
 
     for page in range(1, pages + 1):
         url = f'https://cryptopanic.com/api/v1/posts/?auth_token={API_KEY}&kind=news&filter=rising&page={page}'
-        response = requests.get(url)
+        response = http.get(url)
 
         if response.status_code != 200:
             print(f"Failed on page {page}, status code: {response.status_code}")
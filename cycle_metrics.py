@@ -0,0 +1,169 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# === Trading-Cycle Instrumentation ===
+# Wall time per stage (fetch, indicators, predict, orders, telegram, ...) and per
+# symbol, API calls and errors by endpoint, all aggregated into cumulative
+# histograms/counters. Each finished cycle appends one JSON line with its own
+# breakdown to metrics_{bot}.jsonl; the aggregates are served in Prometheus text
+# format on /metrics. Everything is lock-protected because fetches run on threads.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+PREFIX = "trader"
+METRICS_HOST = "127.0.0.1"   # loopback only; pass a host (e.g. 0.0.0.0) to expose it to a remote scraper
+
+class CycleMetrics:
+    def __init__(self, bot, jsonl_path=None):
+        self.bot = bot
+        self.jsonl_path = jsonl_path or f"metrics_{bot}.jsonl"
+        self.lock = threading.Lock()
+        self.histograms = {}   # (name, labels) -> [bucket counts..., sum, count]
+        self.counters = {}     # (name, labels) -> value
+        self.current = None    # breakdown of the cycle in progress
+
+    # === Recording ===
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            h = self.histograms.setdefault(key, [0] * (len(BUCKETS) + 2))
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    h[i] += 1
+            h[-2] += seconds
+            h[-1] += 1
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+            if self.current is not None and name in ("api_calls_total", "errors_total"):
+                field = "api_calls" if name == "api_calls_total" else "errors"
+                self.current[field] += value
+
+    def error(self, stage, symbol=None):
+        self.inc("errors_total", stage=stage)
+        if symbol is not None:
+            with self.lock:
+                if self.current is not None:
+                    self.current["symbol_errors"].setdefault(symbol, []).append(stage)
+
+    @contextmanager
+    def stage(self, name, symbol=None):
+        # without a symbol: wall time of a whole cycle stage; with one: that symbol's share
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.error(name, symbol)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            if symbol is None:
+                self.observe("stage_seconds", elapsed, stage=name)
+            else:
+                self.observe("symbol_stage_seconds", elapsed, stage=name)
+            with self.lock:
+                if self.current is not None:
+                    target = self.current["stages"] if symbol is None else \
+                        self.current["symbols"].setdefault(symbol, {})
+                    target[name] = round(target.get(name, 0.0) + elapsed, 6)
+
+    @contextmanager
+    def cycle(self):
+        with self.lock:
+            self.current = {"stages": {}, "symbols": {}, "api_calls": 0, "errors": 0, "symbol_errors": {}}
+        started = time.time()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.observe("cycle_seconds", elapsed)
+            with self.lock:
+                record, self.current = self.current, None
+            record.update(time=started, bot=self.bot, seconds=round(elapsed, 6))
+            with open(self.jsonl_path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+
+    # === API Call Hooks ===
+    def observe_http(self, method, url, status, seconds):
+        # HttpClient observer signature
+        endpoint = urlsplit(url).netloc + urlsplit(url).path
+        self.inc("api_calls_total", endpoint=endpoint)
+        self.observe("api_seconds", seconds, endpoint=endpoint)
+        if status is None or status >= 400:
+            self.inc("api_errors_total", endpoint=endpoint, status=str(status))
+
+    def instrument_client(self, client):
+        # python-binance routes every REST call through Client._request
+        request = client._request
+        def timed_request(method, uri, *args, **kwargs):
+            start = time.perf_counter()
+            status = None
+            try:
+                response = request(method, uri, *args, **kwargs)
+                status = 200
+                return response
+            except Exception as e:
+                status = getattr(e, "status_code", None)
+                raise
+            finally:
+                self.observe_http(method, uri, status, time.perf_counter() - start)
+        client._request = timed_request
+        return client
+
+    # === Export ===
+    def render(self):
+        lines = []
+        with self.lock:
+            histograms = dict(self.histograms)
+            counters = dict(self.counters)
+        typed = set()
+        for (name, labels), value in sorted(counters.items()):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {PREFIX}_{name} counter")
+            lines.append(f"{PREFIX}_{name}{_labels(self.bot, labels)} {value}")
+        for (name, labels), h in sorted(histograms.items()):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {PREFIX}_{name} histogram")
+            for bound, count in zip(BUCKETS, h):
+                lines.append(f"{PREFIX}_{name}_bucket{_labels(self.bot, labels, le=bound)} {count}")
+            lines.append(f"{PREFIX}_{name}_bucket{_labels(self.bot, labels, le='+Inf')} {h[-1]}")
+            lines.append(f"{PREFIX}_{name}_sum{_labels(self.bot, labels)} {h[-2]:.6f}")
+            lines.append(f"{PREFIX}_{name}_count{_labels(self.bot, labels)} {h[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host=METRICS_HOST):
+        metrics = self
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            def log_message(self, *args):
+                pass
+        try:
+            server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            print(f"⚠️ Metrics endpoint not started on {host}:{port}: {e}")
+            return None
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"📈 Metrics on http://{host}:{port}/metrics, cycles in {os.path.abspath(self.jsonl_path)}")
+        return server
+
+
+def _labels(bot, labels, **extra):
+    pairs = [("bot", bot)] + list(labels) + list(extra.items())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
@@ -1,11 +1,7 @@
 import streamlit as st
 import pandas as pd
-import os
-from datetime import datetime
-from binance.client import Client
-from binance_keys import API_KEY, API_SECRET
-
-client = Client(API_KEY, API_SECRET)
+from fifo_ledger import daily_realized, match_fills
+from dashboard_data import clear_exchange_cache, fetch_balances, fetch_prices, load_equity, total_aum, trade_log
 
 st.set_page_config(page_title="Jad's AI Trading Dashboard", layout="wide")
 st.title("📊 Jad’s AI Trading Dashboard")
@@ -13,89 +9,69 @@ st.title("📊 Jad’s AI Trading Dashboard")
 # === LOAD TRADE LOG ===
 def load_trades():
     try:
-        df = pd.read_csv("executed_trades.csv", on_bad_lines='skip')
-        if "Timestamp" not in df.columns or "Price" not in df.columns:
-            st.warning("⚠️ Missing expected columns in executed_trades.csv.")
-            return pd.DataFrame()
-        df["Timestamp"] = pd.to_datetime(df["Timestamp"], errors='coerce')
-        df["Date"] = df["Timestamp"].dt.date
-        df["Price"] = pd.to_numeric(df["Price"], errors='coerce')
-        df["Quantity"] = pd.to_numeric(df["Quantity"], errors='coerce')
-        return df.dropna(subset=["Timestamp", "Price", "Quantity"])
+        return trade_log().read()
     except Exception as e:
         st.error(f"Error loading trades: {e}")
         return pd.DataFrame()
 
 # === PNL SUMMARY ===
 def calculate_pnl(df):
-    pnl_summary = []
-    daily = {}
-    buys = {}
-
-    for _, row in df.iterrows():
-        date = row["Date"]
-        symbol = row["Symbol"]
-        if date not in daily:
-            daily[date] = 0
-
-        if row["Side"] == "BUY":
-            buys[symbol] = (row["Price"], row["Quantity"])
-        elif row["Side"] == "SELL" and symbol in buys:
-            buy_price, qty = buys[symbol]
-            pnl = (row["Price"] - buy_price) * qty
-            daily[date] += pnl
-            del buys[symbol]
+    # FIFO lots, same matcher the bot's pnl_ledger uses
+    if df.empty:
+        return pd.DataFrame(columns=["Date", "Realized PnL (USD)"]), pd.DataFrame()
+    fills = df[["Timestamp", "Symbol", "Side", "Price", "Quantity"]].rename(columns=str.lower)
+    matched, lots = match_fills(fills)
+    daily = daily_realized(matched).rename(columns={"date": "Date", "realized_pnl": "Realized PnL (USD)"})
+    lots = lots.rename(columns={"timestamp": "Bought", "symbol": "Symbol", "quantity": "Quantity", "unit_cost": "Unit Cost"})
+    return daily, lots
 
-    for date, pnl in daily.items():
-        pnl_summary.append({"Date": date, "Realized PnL (USD)": pnl})
-
-    return pd.DataFrame(pnl_summary)
+@st.cache_data(max_entries=1, show_spinner=False)
+def cached_pnl(_df, version):
+    # recomputed only when the trade log has grown (_df is not hashed, version is)
+    return calculate_pnl(_df)
 
 # === ASSET ALLOCATION ===
-def get_asset_allocation():
-    try:
-        balances = client.get_account()["balances"]
-        allocation = {
-            b["asset"]: float(b["free"]) + float(b["locked"])
-            for b in balances
-            if float(b["free"]) + float(b["locked"]) > 0 and not b["asset"].startswith("LD")
-        }
-        return pd.DataFrame(list(allocation.items()), columns=["Asset", "Amount"])
-    except Exception as e:
-        st.error(f"Failed to fetch account balances: {e}")
-        return pd.DataFrame()
+def get_asset_allocation(balances):
+    return pd.DataFrame(list(balances.items()), columns=["Asset", "Amount"])
 
 # === AUM ===
-def get_total_aum():
+def get_total_aum(balances):
     try:
-        total = 0
-        prices = {s['symbol']: float(s['price']) for s in client.get_all_tickers()}
-        balances = client.get_account()["balances"]
-        for b in balances:
-            asset = b["asset"]
-            free = float(b["free"])
-            locked = float(b["locked"])
-            amount = free + locked
-            if asset == "USDT":
-                total += amount
-            elif asset + "USDT" in prices:
-                total += amount * prices[asset + "USDT"]
-        return round(total, 2)
-    except:
+        return total_aum(balances, fetch_prices())
+    except Exception:
         return "N/A"
 
 # === REFRESH ===
 if st.button("🔄 Refresh Dashboard"):
+    clear_exchange_cache()
     st.rerun()
 
 # === DISPLAY SECTIONS ===
 df_trades = load_trades()
-df_pnl = calculate_pnl(df_trades)
-df_allocation = get_asset_allocation()
-aum = get_total_aum()
+df_pnl, df_lots = cached_pnl(df_trades, trade_log().version)
+try:
+    balances = fetch_balances()   # one account fetch shared by AUM and allocation
+except Exception as e:
+    st.error(f"Failed to fetch account balances: {e}")
+    balances = {}
+df_allocation = get_asset_allocation(balances)
+aum = get_total_aum(balances) if balances else "N/A"
 
 st.subheader(f"💰 Total AUM: ${aum}")
 
+# === EQUITY ===
+equity_stats, equity_latest, equity_curve = load_equity()
+if equity_latest.get("last") is not None:
+    st.metric("Equity", f"${equity_latest['last']:,.2f}", f"peak ${equity_latest.get('peak') or equity_latest['last']:,.2f}", delta_color="off")
+if equity_stats:
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Drawdown", f"{equity_stats['drawdown']:.1%}", f"max {equity_stats['max_drawdown']:.1%}", delta_color="off")
+    c2.metric("Annual Volatility", f"{equity_stats['annual_volatility']:.1%}")
+    c3.metric("Sharpe", f"{equity_stats['sharpe']:.2f}")
+    c4.metric("Avg Exposure", f"{equity_stats['avg_exposure']:.0%}")
+    if not equity_curve.empty:
+        st.line_chart(equity_curve)
+
 col1, col2 = st.columns(2)
 with col1:
     st.subheader("📅 Daily Realized PnL")
@@ -108,5 +84,11 @@ with col2:
     else:
         st.write("No active assets found.")
 
+st.subheader("📂 Open Lots")
+if not df_lots.empty:
+    st.dataframe(df_lots, use_container_width=True)
+else:
+    st.write("No open lots.")
+
 st.subheader("📜 Executed Trades")
 st.dataframe(df_trades.sort_values("Timestamp", ascending=False), use_container_width=True)
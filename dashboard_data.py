@@ -0,0 +1,102 @@
+import os
+import threading
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+from binance.client import Client
+from binance_keys import API_KEY, API_SECRET
+from equity_tracker import load_summary, tier_path
+from state_store import StateStore
+
+# === Dashboard Data Layer ===
+# Exchange calls are cached with a TTL and shared across reruns and browser
+# sessions, so a page refresh costs no API weight until the TTL lapses; the
+# account is fetched once per refresh for both AUM and allocation. Trades and
+# equity come from the bot's state store; trades are tail-read, so a rerun only
+# queries fills recorded since the last one.
+TRADE_COLUMNS = ["Timestamp", "Symbol", "Side", "Confidence", "Price", "Quantity", "Tag"]
+STORE_COLUMNS = ["timestamp", "symbol", "side", "confidence", "price", "quantity", "tag"]
+CURVE_DAYS = 7   # raw equity samples shown; older history comes from the hourly tier
+ACCOUNT_TTL = 30   # seconds
+PRICES_TTL = 30
+
+@st.cache_resource
+def get_client():
+    return Client(API_KEY, API_SECRET)
+
+@st.cache_data(ttl=ACCOUNT_TTL, show_spinner=False)
+def fetch_balances():
+    # {asset: free + locked} for every non-zero, non-earn balance
+    balances = {}
+    for b in get_client().get_account()["balances"]:
+        amount = float(b["free"]) + float(b["locked"])
+        if amount > 0 and not b["asset"].startswith("LD"):
+            balances[b["asset"]] = amount
+    return balances
+
+@st.cache_data(ttl=PRICES_TTL, show_spinner=False)
+def fetch_prices():
+    return {t["symbol"]: float(t["price"]) for t in get_client().get_all_tickers()}
+
+def clear_exchange_cache():
+    fetch_balances.clear()
+    fetch_prices.clear()
+
+def total_aum(balances, prices):
+    total = 0.0
+    for asset, amount in balances.items():
+        if asset == "USDT":
+            total += amount
+        elif asset + "USDT" in prices:
+            total += amount * prices[asset + "USDT"]
+    return round(total, 2)
+
+
+# === Trade Log Tail ===
+@st.cache_resource
+def get_store():
+    # read side of the bot's state store; WAL lets it read while the bot writes
+    return StateStore()
+
+class TradeLogTail:
+    def __init__(self, store):
+        self.store = store
+        self.last_id = 0
+        self.frame = pd.DataFrame(columns=TRADE_COLUMNS + ["Date"])
+        self.version = 0   # bumped whenever rows are added, for downstream caches
+        self.lock = threading.Lock()   # reruns from several browser sessions share this reader
+
+    def read(self):
+        with self.lock:
+            new = self.store.fills(after_id=self.last_id)
+            if new.empty:
+                return self.frame
+            self.last_id = int(new["id"].iloc[-1])
+            new = new.drop(columns="id").rename(columns=dict(zip(STORE_COLUMNS, TRADE_COLUMNS)))[TRADE_COLUMNS]
+            new["Date"] = new["Timestamp"].dt.date
+            self.frame = pd.concat([self.frame, new], ignore_index=True) if len(self.frame) else new
+            self.version += 1
+            return self.frame
+
+
+@st.cache_resource
+def trade_log():
+    # one tail reader per server process, shared by every rerun
+    return TradeLogTail(get_store())
+
+
+# === Equity ===
+def load_equity(tier="hour"):
+    # (tracker stats, stored last/peak, curve): raw stored samples for the last
+    # CURVE_DAYS, the downsampled tier before that
+    store = get_store()
+    start = pd.Timestamp.now() - pd.Timedelta(days=CURVE_DAYS)
+    recent = store.equity_history(start=start).set_index("timestamp")["equity"]
+    path = tier_path(tier)
+    older = pd.read_csv(path) if os.path.exists(path) else pd.DataFrame(columns=["time", "close"])
+    # tier buckets are epoch seconds; stored samples are local wall-clock time like the fills
+    older["time"] = pd.to_datetime(older["time"].map(datetime.fromtimestamp))
+    older = older[older["time"] < (recent.index[0] if len(recent) else pd.Timestamp.max)]
+    curve = pd.concat([older.set_index("time")["close"].astype(float), recent]).rename("equity")
+    return load_summary(), store.get_equity(), curve
@@ -0,0 +1,158 @@
+import csv
+import json
+import math
+import os
+import time
+from collections import deque
+
+# === Streaming Equity Tracker ===
+# One sample per cycle goes into an in-memory ring buffer and rolls up into
+# minute/hour/day OHLC tiers appended under equity_history/. Peak, max drawdown,
+# exposure and return volatility (Welford) are updated per sample, so readers
+# get the statistics from equity.json without replaying trades or history.
+# equity.json keeps the old "peak"/"last" keys for anything still reading them.
+EQUITY_FILE = "equity.json"
+HISTORY_DIR = "equity_history"
+RING_SIZE = 2016          # one week of 5-minute cycles
+TIERS = {"minute": 60, "hour": 3600, "day": 86400}
+DRAWDOWN_ALERTS = (0.05, 0.10, 0.20)
+SECONDS_PER_YEAR = 365 * 86400
+
+def account_equity(balances, price):
+    # balances {asset: amount}, price(symbol) -> float or None; returns (equity, exposure)
+    cash = invested = 0.0
+    for asset, amount in balances.items():
+        if asset == "USDT":
+            cash += amount
+            continue
+        p = price(asset + "USDT")
+        if p:
+            invested += amount * p
+    total = cash + invested
+    return total, (invested / total if total else 0.0)
+
+
+class EquityTracker:
+    def __init__(self, path=EQUITY_FILE, history_dir=HISTORY_DIR, ring_size=RING_SIZE):
+        self.path = path
+        self.history_dir = history_dir
+        self.ring = deque(maxlen=ring_size)   # (epoch seconds, equity, exposure)
+        self.stats = {
+            "peak": None, "last": None, "drawdown": 0.0, "max_drawdown": 0.0,
+            "samples": 0, "first_time": None, "last_time": None,
+            "return_mean": 0.0, "return_m2": 0.0, "exposure_sum": 0.0,
+        }
+        self.buckets = {}       # tier -> [bucket_start, open, high, low, close]
+        self.alerted = 0.0      # deepest drawdown level alerted since the last peak
+        self.load()
+
+    # === Updates ===
+    def update(self, equity, exposure=0.0, timestamp=None):
+        # returns the drawdown alert level newly crossed, or None
+        now = time.time() if timestamp is None else timestamp
+        s = self.stats
+        if s["last"]:
+            # Welford on per-sample returns
+            r = equity / s["last"] - 1
+            n = s["samples"]   # returns seen so far + 1
+            delta = r - s["return_mean"]
+            s["return_mean"] += delta / n
+            s["return_m2"] += delta * (r - s["return_mean"])
+        s["samples"] += 1
+        s["exposure_sum"] += exposure
+        s["first_time"] = s["first_time"] or now
+        s["last_time"] = now
+        s["last"] = equity
+        if s["peak"] is None or equity > s["peak"]:
+            s["peak"] = equity
+            self.alerted = 0.0
+        s["drawdown"] = 1 - equity / s["peak"] if s["peak"] else 0.0
+        s["max_drawdown"] = max(s["max_drawdown"], s["drawdown"])
+
+        self.ring.append((now, equity, exposure))
+        for tier, seconds in TIERS.items():
+            self._roll(tier, seconds, now, equity)
+        self.save()
+
+        crossed = [level for level in DRAWDOWN_ALERTS if s["drawdown"] >= level > self.alerted]
+        if crossed:
+            self.alerted = max(crossed)
+            return self.alerted
+        return None
+
+    def _roll(self, tier, seconds, now, equity):
+        start = now - now % seconds
+        bucket = self.buckets.get(tier)
+        if bucket and bucket[0] == start:
+            bucket[2] = max(bucket[2], equity)
+            bucket[3] = min(bucket[3], equity)
+            bucket[4] = equity
+            return
+        if bucket:
+            self._append(tier, bucket)
+        self.buckets[tier] = [start, equity, equity, equity, equity]
+
+    def _append(self, tier, bucket):
+        os.makedirs(self.history_dir, exist_ok=True)
+        path = tier_path(tier, self.history_dir)
+        new = not os.path.exists(path)
+        with open(path, "a", newline="") as f:
+            writer = csv.writer(f)
+            if new:
+                writer.writerow(["time", "open", "high", "low", "close"])
+            writer.writerow([int(bucket[0])] + bucket[1:])
+
+    # === Statistics ===
+    def summary(self):
+        return summarize(self.stats)
+
+    # === Persistence ===
+    def save(self):
+        state = {"peak": self.stats["peak"], "last": self.stats["last"], "stats": self.stats,
+                 "summary": self.summary(), "buckets": self.buckets, "alerted": self.alerted,
+                 "ring": list(self.ring)}
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.path)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            state = json.load(f)
+        if "stats" not in state:
+            # legacy {"peak", "last"}: keep the peak so drawdown continues from it
+            self.stats["peak"] = state.get("peak")
+            return
+        self.stats.update(state["stats"])
+        self.buckets = state.get("buckets", {})
+        self.alerted = state.get("alerted", 0.0)
+        self.ring.extend(tuple(x) for x in state.get("ring", []))
+
+
+def summarize(stats):
+    returns = stats["samples"] - 1
+    vol = math.sqrt(stats["return_m2"] / (returns - 1)) if returns > 1 else 0.0
+    span = (stats["last_time"] or 0) - (stats["first_time"] or 0)
+    per_year = returns / span * SECONDS_PER_YEAR if span > 0 else 0.0
+    return {
+        "equity": stats["last"],
+        "peak": stats["peak"],
+        "drawdown": stats["drawdown"],
+        "max_drawdown": stats["max_drawdown"],
+        "volatility": vol,
+        "annual_volatility": vol * math.sqrt(per_year),
+        "sharpe": stats["return_mean"] / vol * math.sqrt(per_year) if vol else 0.0,
+        "avg_exposure": stats["exposure_sum"] / stats["samples"] if stats["samples"] else 0.0,
+        "samples": stats["samples"],
+    }
+
+def tier_path(tier, history_dir=HISTORY_DIR):
+    return os.path.join(history_dir, f"equity_{tier}.csv")
+
+def load_summary(path=EQUITY_FILE):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f).get("summary")
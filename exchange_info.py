@@ -0,0 +1,79 @@
+import time
+from decimal import Decimal, ROUND_DOWN
+
+# === Exchange Metadata Cache ===
+# One bulk get_exchange_info() call loads LOT_SIZE / PRICE_FILTER / MIN_NOTIONAL
+# for every symbol. The bots call refresh_if_stale() in the cycle's snapshot
+# stage, so lookups on the order path are always dict hits and never block on
+# REST; a symbol missing from the cache is treated as untradable.
+
+class ExchangeInfoCache:
+    def __init__(self, client, ttl=3600):
+        self.client = client
+        self.ttl = ttl
+        self.filters = {}
+        self.loaded_at = 0
+
+    def refresh(self):
+        info = self.client.get_exchange_info()
+        filters = {}
+        for s in info["symbols"]:
+            by_type = {f["filterType"]: f for f in s["filters"]}
+            lot = by_type.get("LOT_SIZE", {})
+            price = by_type.get("PRICE_FILTER", {})
+            # spot symbols moved from MIN_NOTIONAL to NOTIONAL; accept either
+            notional = by_type.get("MIN_NOTIONAL") or by_type.get("NOTIONAL") or {}
+            filters[s["symbol"]] = {
+                "step_size": Decimal(lot.get("stepSize", "0")),
+                "min_qty": float(lot.get("minQty", 0)),
+                "tick_size": Decimal(price.get("tickSize", "0")),
+                "min_notional": float(notional.get("minNotional", 0)),
+            }
+        self.filters = filters
+        self.loaded_at = time.time()
+
+    def refresh_if_stale(self):
+        if self.filters and time.time() - self.loaded_at <= self.ttl:
+            return
+        try:
+            self.refresh()
+        except Exception as e:
+            print("❌ Exchange info refresh failed, using cached filters:", e)
+
+    def get(self, symbol):
+        return self.filters.get(symbol)
+
+    # === Rounding Helpers ===
+    def round_quantity(self, symbol, quantity):
+        # floor to the lot step so an order never exceeds balance or is rejected
+        f = self.get(symbol)
+        if not f or not f["step_size"]:
+            return quantity
+        return float(_floor_to(quantity, f["step_size"]))
+
+    def format_quantity(self, symbol, quantity):
+        # order parameter: fixed-point at the lot step's precision; str(9e-05) would be rejected
+        f = self.get(symbol)
+        if not f or not f["step_size"]:
+            return format(Decimal(str(quantity)), "f")
+        return f"{_floor_to(quantity, f['step_size']):.{_decimals(f['step_size'])}f}"
+
+    def round_price(self, symbol, price):
+        f = self.get(symbol)
+        if not f or not f["tick_size"]:
+            return price
+        return float(_floor_to(price, f["tick_size"]))
+
+    def is_tradable(self, symbol, quantity, price):
+        f = self.get(symbol)
+        if not f:
+            return False
+        return quantity >= f["min_qty"] and quantity * price >= f["min_notional"]
+
+
+def _decimals(step):
+    return max(-step.normalize().as_tuple().exponent, 0)
+
+def _floor_to(value, step):
+    steps = (Decimal(str(value)) / step).to_integral_value(rounding=ROUND_DOWN)
+    return (steps * step).normalize()
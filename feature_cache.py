@@ -0,0 +1,95 @@
+import hashlib
+import inspect
+import json
+import os
+
+import pandas as pd
+
+from ohlcv_store import load_frame, save_frame, store_path
+
+# === Content-Keyed Feature Cache ===
+# Derived datasets (indicators, labels) remember what they were built from in a
+# {symbol}.cache.json sidecar: the step key (name + parameters + source hash of
+# the code that computes it) and one hash per input row. On the next run a
+# symbol whose input and key are unchanged is skipped; if the old input is an
+# unchanged prefix of the new one, only the appended bars are recomputed, from a
+# warm-up window of earlier bars, and spliced onto the stored output. Anything
+# else (key change, edited history, filled gap, missing output) rebuilds fully.
+WARMUP = 700   # bars before the tail; EMAs (span <= 50) forget their seed to ~1e-12 within it
+
+def code_version(*modules):
+    digest = hashlib.sha256()
+    for module in modules:
+        digest.update(inspect.getsource(module).encode())
+    return digest.hexdigest()[:16]
+
+def cache_key(step, params, *modules):
+    payload = json.dumps({"step": step, "params": params, "code": code_version(*modules)}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+def row_hashes(df):
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+def _digest(hashes):
+    return hashlib.sha256(hashes.tobytes()).hexdigest()
+
+def _entry_path(symbol, dataset):
+    return store_path(symbol, dataset).replace(".parquet", ".cache.json")
+
+def _load_entry(symbol, dataset):
+    path = _entry_path(symbol, dataset)
+    if not os.path.exists(path) or not os.path.exists(store_path(symbol, dataset)):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+class CachePlan:
+    def __init__(self, symbol, target, key, source, existing, start, hashes):
+        self.symbol = symbol
+        self.target = target
+        self.key = key
+        self.source = source        # full input frame
+        self.existing = existing    # stored output rows [0, start), or None
+        self.start = start          # first input row that needs computing
+        self.hashes = hashes
+
+    @property
+    def done(self):
+        return self.start >= len(self.source)
+
+    @property
+    def new_rows(self):
+        return len(self.source) - self.start
+
+    def window(self, warmup=WARMUP):
+        # input rows to compute on: the tail plus `warmup` bars of history
+        return self.source.iloc[max(0, self.start - warmup):].reset_index(drop=True)
+
+    def save(self, computed):
+        # computed: the step's output for window(); keeps only rows >= start
+        tail = computed.iloc[len(computed) - self.new_rows:]
+        df = tail if self.existing is None else pd.concat([self.existing, tail], ignore_index=True)
+        save_frame(self.symbol, self.target, df)
+        with open(_entry_path(self.symbol, self.target), "w") as f:
+            json.dump({"key": self.key, "rows": len(self.source), "digest": _digest(self.hashes)}, f)
+        return df
+
+
+def plan(symbol, source, target, key, rebuild=False):
+    # None when the input dataset is missing; otherwise a CachePlan (done when up to date)
+    df = load_frame(symbol, source)
+    if df is None:
+        return None
+    hashes = row_hashes(df)
+    entry = None if rebuild else _load_entry(symbol, target)
+    start = 0
+    if entry is not None and entry["key"] == key and entry["rows"] <= len(df) \
+            and entry["digest"] == _digest(hashes[:entry["rows"]]):
+        start = entry["rows"]
+    existing = None
+    if 0 < start < len(df):
+        existing = load_frame(symbol, target)
+        if existing is None or len(existing) != start:
+            start, existing = 0, None
+    return CachePlan(symbol, target, key, df, existing, start, hashes)
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+# === Vectorized FIFO Trade Matching ===
+# Fills are matched per symbol against FIFO buy lots without a Python loop over
+# rows. Within a symbol, the quantity sold so far is mapped onto the cumulative
+# cost curve of everything bought so far (np.interp), so the cost of any sell is
+# a difference of two points on that curve. Sells larger than the inventory
+# bought before them (coins bought before the log started) only match what is
+# available: matched = cum_sold + running_min(0, cum_bought - cum_sold).
+# Buy fees go into the lot's cost basis; sell fees reduce proceeds.
+#
+# Input frame columns: timestamp, symbol, side, price, quantity, optional fee
+# (quote currency). Rows are taken in their given order.
+
+def _group_match(buy, qty, price, fee):
+    # one symbol: returns matched quantity per row, FIFO cost per row, remaining qty per buy row
+    buy_qty = np.where(buy, qty, 0.0)
+    sell_qty = np.where(buy, 0.0, qty)
+    cum_bought = np.cumsum(buy_qty)
+    cum_sold = np.cumsum(sell_qty)
+    matched_cum = cum_sold + np.minimum.accumulate(np.minimum(0.0, cum_bought - cum_sold))
+    matched_cum = np.maximum.accumulate(matched_cum)   # guard float noise
+    matched = np.diff(matched_cum, prepend=0.0) * ~buy
+
+    lot_ends = cum_bought[buy]
+    lot_costs = np.cumsum((price * qty + fee)[buy])
+    curve_q = np.concatenate(([0.0], lot_ends))
+    curve_c = np.concatenate(([0.0], lot_costs))
+    cost_at = np.interp(matched_cum, curve_q, curve_c) if len(lot_ends) else np.zeros_like(matched_cum)
+    cost = np.diff(cost_at, prepend=0.0) * ~buy
+
+    consumed = matched_cum[-1] if len(matched_cum) else 0.0
+    lot_starts = lot_ends - qty[buy]
+    remaining = np.zeros_like(qty)
+    remaining[buy] = np.clip(lot_ends - np.maximum(lot_starts, consumed), 0.0, None)
+    return matched, cost, remaining
+
+def match_fills(fills):
+    # returns (fills with matched_qty / cost_basis / realized_pnl columns, open lots frame)
+    df = fills.reset_index(drop=True).copy()
+    qty = df["quantity"].to_numpy(dtype=float)
+    price = df["price"].to_numpy(dtype=float)
+    fee = df["fee"].to_numpy(dtype=float) if "fee" in df else np.zeros(len(df))
+    buy = (df["side"] == "BUY").to_numpy()
+
+    matched = np.zeros(len(df))
+    cost = np.zeros(len(df))
+    remaining = np.zeros(len(df))
+    for _, idx in df.groupby("symbol", sort=False).indices.items():
+        matched[idx], cost[idx], remaining[idx] = _group_match(buy[idx], qty[idx], price[idx], fee[idx])
+
+    sold_share = np.divide(matched, qty, out=np.zeros(len(df)), where=(~buy) & (qty > 0))
+    proceeds = price * matched - fee * sold_share
+    df["matched_qty"] = matched
+    df["cost_basis"] = cost
+    df["realized_pnl"] = np.where(buy, 0.0, proceeds - cost)
+
+    open_mask = buy & (remaining > 1e-12)
+    lots = df.loc[open_mask, ["timestamp", "symbol"]].copy()
+    lots["quantity"] = remaining[open_mask]
+    lots["unit_cost"] = (price + fee / np.where(qty > 0, qty, 1.0))[open_mask]
+    return df, lots.reset_index(drop=True)
+
+def daily_realized(matched, time_col="timestamp"):
+    # every date with a fill appears, days with only buys at 0
+    dates = pd.to_datetime(matched[time_col], format="ISO8601").dt.date
+    daily = matched["realized_pnl"].groupby(dates).sum()
+    return daily.rename_axis("date").reset_index(name="realized_pnl")
@@ -1,5 +1,9 @@
-import pandas as pd
-import os
+import sys
+
+import feature_cache
+import indicators
+from indicators import FEATURE_SETS, add_indicators_many
+from parallel_runner import chunks, run_parallel, worker_count
 
 # Your 13 coins
 symbols = [
@@ -8,41 +12,30 @@ symbols = [
     "DOGEUSDT", "SHIBUSDT", "PEPEUSDT", "WIFUSDT"
 ]
 
-def compute_indicators(df):
-    df["close"] = pd.to_numeric(df["close"], errors="coerce")
-    df["volume"] = pd.to_numeric(df["volume"], errors="coerce")
-
-    # RSI
-    delta = df["close"].diff()
-    gain = delta.where(delta > 0, 0)
-    loss = -delta.where(delta < 0, 0)
-    avg_gain = gain.rolling(14).mean()
-    avg_loss = loss.rolling(14).mean()
-    rs = avg_gain / avg_loss
-    df["rsi_14"] = 100 - (100 / (1 + rs))
-
-    # MACD
-    ema12 = df["close"].ewm(span=12, adjust=False).mean()
-    ema26 = df["close"].ewm(span=26, adjust=False).mean()
-    df["macd"] = ema12 - ema26
-    df["macd_signal"] = df["macd"].ewm(span=9, adjust=False).mean()
-
-    # EMA
-    df["ema_20"] = df["close"].ewm(span=20, adjust=False).mean()
-
-    # Volume spike
-    df["volume_sma_8"] = df["volume"].rolling(window=8).mean()
-    df["volume_spike_%"] = ((df["volume"] - df["volume_sma_8"]) / df["volume_sma_8"]) * 100
-
-    return df
-
-# Process all 13 coins
-for symbol in symbols:
-    file = f"{symbol}_1h.csv"
-    if os.path.exists(file):
-        df = pd.read_csv(file, parse_dates=["timestamp"])
-        df = compute_indicators(df)
-        df.to_csv(f"{symbol}_1h_indicators.csv", index=False)
-        print(f"✅ {symbol} indicators added.")
-    else:
-        print(f"❌ File not found: {file}")
+# Outputs are cached on the input rows, the feature set and the indicator code:
+# unchanged coins are skipped and appended bars are computed from a warm-up tail.
+# --rebuild ignores the cache.
+CACHE_KEY = feature_cache.cache_key("1h_indicators", FEATURE_SETS["hourly"], indicators)
+REBUILD = "--rebuild" in sys.argv
+
+# One chunk of coins per worker; each chunk is loaded, computed in one vectorized pass and saved
+def process_chunk(chunk):
+    plans, status = {}, {}
+    for symbol in chunk:
+        plan = feature_cache.plan(symbol, "1h", "1h_indicators", CACHE_KEY, REBUILD)
+        if plan is None:
+            status[symbol] = f"❌ No 1h data for {symbol}"
+        elif plan.done:
+            status[symbol] = f"✔️ {symbol} indicators up to date."
+        else:
+            plans[symbol] = plan
+    windows = {symbol: plan.window() for symbol, plan in plans.items()}
+    for symbol, df in add_indicators_many(windows, "hourly").items():
+        plans[symbol].save(df)
+        status[symbol] = f"✅ {symbol} indicators added ({plans[symbol].new_rows} new bars)."
+    return [status[symbol] for symbol in chunk]
+
+if __name__ == "__main__":
+    for messages in run_parallel(process_chunk, chunks(symbols, worker_count()), label="chunks"):
+        for message in messages or []:
+            print(message)
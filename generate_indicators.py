@@ -1,5 +1,9 @@
-import pandas as pd
-import os
+import sys
+
+import feature_cache
+import indicators
+from indicators import FEATURE_SETS, add_indicators_many
+from parallel_runner import chunks, run_parallel, worker_count
 
 # List of your coin files
 symbols = [
@@ -8,41 +12,30 @@ symbols = [
     "DOGEUSDT", "SHIBUSDT", "PEPEUSDT", "WIFUSDT"
 ]
 
-def compute_indicators(df):
-    df["close"] = pd.to_numeric(df["close"], errors="coerce")
-    df["volume"] = pd.to_numeric(df["volume"], errors="coerce")
-
-    # RSI (14)
-    delta = df["close"].diff()
-    gain = delta.where(delta > 0, 0)
-    loss = -delta.where(delta < 0, 0)
-    avg_gain = gain.rolling(window=14).mean()
-    avg_loss = loss.rolling(window=14).mean()
-    rs = avg_gain / avg_loss
-    df["rsi_14"] = 100 - (100 / (1 + rs))
-
-    # MACD and Signal (12, 26, 9)
-    ema12 = df["close"].ewm(span=12, adjust=False).mean()
-    ema26 = df["close"].ewm(span=26, adjust=False).mean()
-    df["macd"] = ema12 - ema26
-    df["macd_signal"] = df["macd"].ewm(span=9, adjust=False).mean()
-
-    # SMA and EMA (50)
-    df["sma_50"] = df["close"].rolling(window=50).mean()
-    df["ema_50"] = df["close"].ewm(span=50, adjust=False).mean()
-
-    # Volume change (%)
-    df["volume_change_%"] = df["volume"].pct_change() * 100
-
-    return df
-
-# Process each file
-for symbol in symbols:
-    file = f"{symbol}_historical.csv"
-    if os.path.exists(file):
-        df = pd.read_csv(file, parse_dates=["timestamp"])
-        df = compute_indicators(df)
-        df.to_csv(f"{symbol}_indicators.csv", index=False)
-        print(f"✅ {symbol} indicators saved.")
-    else:
-        print(f"❌ File not found: {file}")
+# Outputs are cached on the input rows, the feature set and the indicator code:
+# unchanged coins are skipped and appended bars are computed from a warm-up tail.
+# --rebuild ignores the cache.
+CACHE_KEY = feature_cache.cache_key("indicators", FEATURE_SETS["daily"], indicators)
+REBUILD = "--rebuild" in sys.argv
+
+# One chunk of coins per worker; each chunk is loaded, computed in one vectorized pass and saved
+def process_chunk(chunk):
+    plans, status = {}, {}
+    for symbol in chunk:
+        plan = feature_cache.plan(symbol, "historical", "indicators", CACHE_KEY, REBUILD)
+        if plan is None:
+            status[symbol] = f"❌ No historical data for {symbol}"
+        elif plan.done:
+            status[symbol] = f"✔️ {symbol} indicators up to date."
+        else:
+            plans[symbol] = plan
+    windows = {symbol: plan.window() for symbol, plan in plans.items()}
+    for symbol, df in add_indicators_many(windows, "daily").items():
+        plans[symbol].save(df)
+        status[symbol] = f"✅ {symbol} indicators saved ({plans[symbol].new_rows} new bars)."
+    return [status[symbol] for symbol in chunk]
+
+if __name__ == "__main__":
+    for messages in run_parallel(process_chunk, chunks(symbols, worker_count()), label="chunks"):
+        for message in messages or []:
+            print(message)
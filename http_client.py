@@ -0,0 +1,124 @@
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# === Shared HTTP Layer ===
+# One pooled keep-alive session for every REST call we make ourselves (klines,
+# Telegram, CryptoPanic, ...). Binance calls are charged against a token-bucket
+# weight budget, the X-MBX-USED-WEIGHT-1M header is tracked, and 429/418
+# responses back off for Retry-After before retrying.
+BINANCE_API = os.environ.get("BINANCE_API_URL", "https://api.binance.com")
+WEIGHT_LIMIT_1M = 6000
+WEIGHT_BUDGET = 0.8      # fraction of the exchange limit we allow ourselves
+REQUEST_TIMEOUT = 10
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, cost=1):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= cost:
+                    self.tokens -= cost
+                    return
+                wait = (cost - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HttpClient:
+    def __init__(self, binance_api=BINANCE_API, weight_limit=WEIGHT_LIMIT_1M, budget=WEIGHT_BUDGET,
+                 pool_size=20, max_retries=5):
+        self.binance_api = binance_api
+        self.weight_limit = weight_limit
+        self.budget = budget
+        self.max_retries = max_retries
+        rate = weight_limit * budget / 60
+        self.bucket = TokenBucket(rate=rate, capacity=rate * 10)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.used_weight = 0
+        self.paused_until = {}   # host -> epoch seconds; a Telegram flood-wait must not stall Binance
+        self.lock = threading.Lock()
+        self.observers = []      # callables (method, url, status or None, seconds), e.g. cycle metrics
+
+    def _is_binance(self, url):
+        return url.startswith(self.binance_api)
+
+    def _wait_for_pause(self, host):
+        delay = self.paused_until.get(host, 0) - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _pause(self, host, seconds):
+        with self.lock:
+            self.paused_until[host] = max(self.paused_until.get(host, 0), time.time() + seconds)
+
+    def _track(self, host, response):
+        used = response.headers.get("X-MBX-USED-WEIGHT-1M")
+        if used is None:
+            return
+        self.used_weight = int(used)
+        if self.used_weight >= self.weight_limit * self.budget:
+            # over budget: sit out the rest of the current one-minute window
+            self._pause(host, 60 - time.time() % 60)
+
+    def _retry_after(self, response, attempt):
+        header = response.headers.get("Retry-After")
+        if header is not None:
+            return float(header)
+        try:
+            # Telegram reports its flood-wait in the JSON body instead
+            return float(response.json()["parameters"]["retry_after"])
+        except Exception:
+            return min(2 ** attempt, 60)
+
+    def request(self, method, url, weight=1, **kwargs):
+        kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+        binance = self._is_binance(url)
+        host = urlsplit(url).netloc
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_pause(host)
+            if binance:
+                self.bucket.acquire(weight)
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except Exception:
+                self._notify(method, url, None, time.perf_counter() - start)
+                raise
+            self._notify(method, url, response.status_code, time.perf_counter() - start)
+            if binance:
+                self._track(host, response)
+            if response.status_code not in (429, 418):
+                return response
+            delay = self._retry_after(response, attempt)
+            print(f"⚠️ HTTP {response.status_code} from {url.split('?')[0]}, backing off {delay:.0f}s")
+            self._pause(host, delay)
+        return response
+
+    def _notify(self, method, url, status, seconds):
+        for observe in self.observers:
+            observe(method, url, status, seconds)
+
+    def get(self, url, weight=1, **kwargs):
+        return self.request("GET", url, weight=weight, **kwargs)
+
+    def post(self, url, weight=1, **kwargs):
+        return self.request("POST", url, weight=weight, **kwargs)
+
+
+http = HttpClient()
@@ -0,0 +1,200 @@
+import copy
+import math
+from collections import deque
+
+from indicators import add_indicators
+
+# === Incremental Indicator State ===
+# Keeps running EMA / rolling-window state per symbol so a newly closed candle
+# costs O(1) instead of rebuilding every indicator from the full frame.
+
+class RollingWindow:
+    def __init__(self, size):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self.total = 0.0
+
+    def push(self, x):
+        if len(self.values) == self.size:
+            old = self.values[0]
+            self.total -= old
+        self.values.append(x)
+        self.total += x
+
+    def copy(self):
+        clone = RollingWindow(self.size)
+        clone.values = deque(self.values, maxlen=self.size)
+        clone.total = self.total
+        return clone
+
+    @property
+    def full(self):
+        return len(self.values) == self.size
+
+    def mean(self):
+        return self.total / self.size if self.full else math.nan
+
+    def std(self):
+        if not self.full:
+            return math.nan
+        # two-pass over the fixed-size window avoids sum-of-squares cancellation
+        mean = self.total / self.size
+        return math.sqrt(sum((x - mean) ** 2 for x in self.values) / (self.size - 1))
+
+
+class EMA:
+    # adjust=True/False mirror pandas' ewm(span=..., adjust=...) exactly
+    def __init__(self, span, adjust=False):
+        self.alpha = 2.0 / (span + 1)
+        self.adjust = adjust
+        self.num = 0.0
+        self.den = 0.0
+        self.value = math.nan
+
+    def push(self, x):
+        if self.adjust:
+            self.num = self.num * (1 - self.alpha) + x
+            self.den = self.den * (1 - self.alpha) + 1
+            self.value = self.num / self.den
+        elif math.isnan(self.value):
+            self.value = x
+        else:
+            self.value = self.value + self.alpha * (x - self.value)
+        return self.value
+
+
+class IndicatorState:
+    def __init__(self, macd_adjust=False):
+        self.last_timestamp = None
+        self.last_close = None
+        self.gains = RollingWindow(14)
+        self.losses = RollingWindow(14)
+        self.ema_20 = EMA(20)
+        self.ema_12 = EMA(12, adjust=macd_adjust)
+        self.ema_26 = EMA(26, adjust=macd_adjust)
+        self.macd_signal = EMA(9, adjust=macd_adjust)
+        self.volume_8 = RollingWindow(8)
+        self.volume_14 = RollingWindow(14)
+        self.ranges = RollingWindow(14)
+        self.closes_14 = RollingWindow(14)
+        self.closes_6 = deque(maxlen=6)
+        self.values = {}
+        self._before_last = None
+
+    def _snapshot(self):
+        snapshot = IndicatorState.__new__(IndicatorState)
+        for name, value in self.__dict__.items():
+            if isinstance(value, RollingWindow):
+                value = value.copy()
+            elif isinstance(value, EMA):
+                value = copy.copy(value)
+            elif isinstance(value, deque):
+                value = deque(value, maxlen=value.maxlen)
+            snapshot.__dict__[name] = value
+        snapshot._before_last = None
+        return snapshot
+
+    def update(self, timestamp, close, volume, high=None, low=None):
+        if self.last_timestamp is not None and timestamp == self.last_timestamp:
+            # the still-open bar is revised every cycle: undo it before re-applying
+            self.__dict__.update(self._before_last.__dict__)
+        elif self.last_timestamp is not None and timestamp < self.last_timestamp:
+            return self.values
+        before = self._snapshot()
+
+        if self.last_close is not None:
+            delta = close - self.last_close
+            self.gains.push(max(delta, 0.0))
+            self.losses.push(max(-delta, 0.0))
+        ema_20 = self.ema_20.push(close)
+        macd = self.ema_12.push(close) - self.ema_26.push(close)
+        macd_signal = self.macd_signal.push(macd)
+        self.volume_8.push(volume)
+        self.volume_14.push(volume)
+        self.closes_14.push(close)
+        self.closes_6.append(close)
+        if high is not None and low is not None:
+            self.ranges.push(high - low)
+
+        avg_gain, avg_loss = self.gains.mean(), self.losses.mean()
+        if avg_gain + avg_loss > 0:
+            rsi = avg_gain / (avg_gain + avg_loss) * 100
+        else:
+            rsi = math.nan
+        volume_sma_8 = self.volume_8.mean()
+        volume_mean_14 = self.volume_14.mean()
+
+        self.values = {
+            "rsi_14": rsi,
+            "ema_20": ema_20,
+            "price_above_ema": int(close > ema_20),
+            "macd": macd,
+            "macd_signal": macd_signal,
+            "volume_sma_8": volume_sma_8,
+            "volume_spike_%": (volume - volume_sma_8) / volume_sma_8 * 100 if volume_sma_8 else math.nan,
+            "atr": self.ranges.mean(),
+            "momentum": close - self.closes_6[0] if len(self.closes_6) == 6 else math.nan,
+            "volatility": self.closes_14.std(),
+            "normalized_volume": volume / volume_mean_14 if volume_mean_14 else math.nan,
+        }
+        self.last_timestamp = timestamp
+        self.last_close = close
+        self._before_last = before
+        return self.values
+
+    def update_from_frame(self, df, time_col="timestamp"):
+        if self.last_timestamp is not None:
+            df = df[df[time_col] >= self.last_timestamp]
+        has_range = "high" in df.columns and "low" in df.columns
+        times = df[time_col].tolist()
+        closes = df["close"].astype(float).tolist()
+        volumes = df["volume"].astype(float).tolist()
+        highs = df["high"].astype(float).tolist() if has_range else [None] * len(times)
+        lows = df["low"].astype(float).tolist() if has_range else [None] * len(times)
+        for ts, close, volume, high, low in zip(times, closes, volumes, highs, lows):
+            self.update(ts, close, volume, high, low)
+        return self.values
+
+    @classmethod
+    def warm_start(cls, df, time_col="timestamp", macd_adjust=False):
+        state = cls(macd_adjust=macd_adjust)
+        state.update_from_frame(df, time_col)
+        return state
+
+    def ready(self, columns):
+        return bool(self.values) and all(not math.isnan(self.values[c]) for c in columns)
+
+
+# === Per-Symbol Book ===
+def latest_indicators(states, key, df, time_col="timestamp", macd_adjust=False, verify=()):
+    # verify: columns checked against a batch recompute whenever the state is (re)built
+    state = states.get(key)
+    if state is None or state.last_timestamp < df[time_col].iloc[0]:
+        # first sight of the symbol, or a gap since the last cycle: rebuild once
+        state = IndicatorState.warm_start(df, time_col, macd_adjust)
+        states[key] = state
+        if verify:
+            mismatches = verify_against_batch(df, verify, time_col=time_col, macd_adjust=macd_adjust, state=state)
+            if mismatches:
+                print(f"⚠️ Incremental indicators for {key} differ from batch: {mismatches}")
+    else:
+        state.update_from_frame(df, time_col)
+    return state
+
+
+# === Batch Parity Check ===
+def verify_against_batch(df, columns, time_col="timestamp", macd_adjust=False, tol=1e-6, state=None):
+    # {column: (batch, incremental)} for last-bar values that disagree; both NaN agrees.
+    # The batch engine only has adjust=False EMAs, so MACD is skipped for adjusted states.
+    state = state or IndicatorState.warm_start(df, time_col, macd_adjust)
+    if macd_adjust:
+        columns = [c for c in columns if c not in ("macd", "macd_signal")]
+    latest = add_indicators(df, columns).iloc[-1]
+    mismatches = {}
+    for col in columns:
+        expected, got = float(latest[col]), float(state.values[col])
+        if math.isnan(expected) and math.isnan(got):
+            continue
+        if not math.isclose(expected, got, rel_tol=tol, abs_tol=tol):
+            mismatches[col] = (expected, got)
+    return mismatches
@@ -0,0 +1,217 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+# === Vectorized Indicator Engine ===
+# Every indicator is computed on a 2-D (symbols x time) array in one pass for the
+# whole universe. Series of different lengths are right-aligned (the latest bar of
+# every symbol sits in the last column) and left-padded with NaN, so rolling
+# windows and EMAs start at each symbol's own first bar exactly as pandas does
+# per symbol. EMAs run through scipy's lfilter along the time axis; rolling
+# statistics use sliding windows in time chunks to bound memory.
+#
+# Formulas follow the training pipeline: EMAs use adjust=False, RSI uses simple
+# 14-bar mean gain/loss. Callers ask for a named FEATURE_SET (or a list of
+# feature names) from the registry below.
+CHUNK = 4096   # time columns per sliding-window block
+
+# === Array Primitives ===
+def ema(x, span, adjust=False):
+    # pandas ewm(span=span, adjust=adjust).mean() per row; rows are gap-free after their first value
+    alpha = 2.0 / (span + 1)
+    decay = 1 - alpha
+    started = np.cumsum(~np.isnan(x), axis=1) > 0
+    if adjust:
+        num = lfilter([1.0], [1.0, -decay], np.where(started, x, 0.0), axis=1)
+        den = lfilter([1.0], [1.0, -decay], started.astype(float), axis=1)
+        out = num / np.where(den > 0, den, np.nan)
+    else:
+        # fill the padding with each row's first value: an EMA of a constant prefix is
+        # that constant, so the filter state at the first real bar is exactly x0
+        first = np.where(started.any(axis=1), started.argmax(axis=1), 0)
+        x0 = x[np.arange(len(x)), first]
+        x0 = np.where(np.isnan(x0), 0.0, x0)
+        filled = np.where(started, x, x0[:, None])
+        out = lfilter([alpha], [1.0, -decay], filled, axis=1, zi=(decay * x0)[:, None])[0]
+    out[~started] = np.nan
+    return out
+
+def rolling(x, window, reducer):
+    # reducer(view, axis=-1) over full windows; windows touching NaN give NaN like min_periods=window
+    out = np.full(x.shape, np.nan)
+    n = x.shape[1]
+    for start in range(window - 1, n, CHUNK):
+        stop = min(start + CHUNK, n)
+        view = sliding_window_view(x[:, start - window + 1:stop], window, axis=1)
+        out[:, start:stop] = reducer(view, axis=-1)
+    return out
+
+def rolling_mean(x, window):
+    return rolling(x, window, np.mean)
+
+def rolling_std(x, window):
+    return rolling(x, window, lambda v, axis: np.std(v, axis=axis, ddof=1))
+
+def shift(x, periods):
+    out = np.full(x.shape, np.nan)
+    out[:, periods:] = x[:, :-periods]
+    return out
+
+def diff(x, periods=1):
+    return x - shift(x, periods)
+
+
+# === Feature Registry ===
+# name -> function(panel) returning a (symbols x time) array; features may use
+# each other through panel[...], which memoizes within one computation.
+FEATURES = {}
+
+def feature(name):
+    def register(fn):
+        FEATURES[name] = fn
+        return fn
+    return register
+
+@feature("ema_12")
+def _ema_12(p):
+    return ema(p["close"], 12)
+
+@feature("ema_20")
+def _ema_20(p):
+    return ema(p["close"], 20)
+
+@feature("ema_26")
+def _ema_26(p):
+    return ema(p["close"], 26)
+
+@feature("ema_50")
+def _ema_50(p):
+    return ema(p["close"], 50)
+
+@feature("sma_50")
+def _sma_50(p):
+    return rolling_mean(p["close"], 50)
+
+@feature("rsi_14")
+def _rsi_14(p):
+    delta = diff(p["close"])
+    gain = rolling_mean(np.where(delta > 0, delta, np.where(np.isnan(delta), np.nan, 0.0)), 14)
+    loss = rolling_mean(np.where(delta < 0, -delta, np.where(np.isnan(delta), np.nan, 0.0)), 14)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - 100 / (1 + gain / loss)
+
+@feature("macd")
+def _macd(p):
+    return p["ema_12"] - p["ema_26"]
+
+@feature("macd_signal")
+def _macd_signal(p):
+    return ema(p["macd"], 9)
+
+@feature("price_above_ema")
+def _price_above_ema(p):
+    return np.where(np.isnan(p["ema_20"]), np.nan, (p["close"] > p["ema_20"]).astype(float))
+
+@feature("volume_sma_8")
+def _volume_sma_8(p):
+    return rolling_mean(p["volume"], 8)
+
+@feature("volume_spike_%")
+def _volume_spike(p):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (p["volume"] - p["volume_sma_8"]) / p["volume_sma_8"] * 100
+
+@feature("volume_change_%")
+def _volume_change(p):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (p["volume"] / shift(p["volume"], 1) - 1) * 100
+
+@feature("atr")
+def _atr(p):
+    return rolling_mean(p["high"] - p["low"], 14)
+
+@feature("momentum")
+def _momentum(p):
+    return p["close"] - shift(p["close"], 5)
+
+@feature("volatility")
+def _volatility(p):
+    return rolling_std(p["close"], 14)
+
+@feature("normalized_volume")
+def _normalized_volume(p):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return p["volume"] / rolling_mean(p["volume"], 14)
+
+FEATURE_SETS = {
+    # live_intraday_signals / generate_hourly_indicators (1h model inputs and their helpers)
+    "hourly": ["rsi_14", "macd", "macd_signal", "ema_20", "volume_sma_8", "volume_spike_%"],
+    # jad_ai_trader_pro / generate_training_data, per timeframe
+    "multi_tf": ["rsi_14", "macd", "macd_signal", "volume_spike_%", "price_above_ema",
+                 "atr", "momentum", "volatility", "normalized_volume"],
+    # backtest_intraday
+    "backtest": ["rsi_14", "price_above_ema", "macd", "macd_signal", "volume_spike_%"],
+    # generate_indicators (daily history)
+    "daily": ["rsi_14", "macd", "macd_signal", "sma_50", "ema_50", "volume_change_%"],
+}
+
+
+class Panel:
+    def __init__(self, arrays):
+        self.values = dict(arrays)
+
+    def __getitem__(self, name):
+        if name not in self.values:
+            if name not in FEATURES:
+                raise KeyError(f"unknown indicator or missing input column: {name}")
+            self.values[name] = FEATURES[name](self)
+        return self.values[name]
+
+
+def feature_names(features):
+    return FEATURE_SETS[features] if isinstance(features, str) else list(features)
+
+def compute(arrays, features):
+    # arrays: {"close": (S, T), ...} -> {name: (S, T)} for the requested features
+    panel = Panel(arrays)
+    return {name: panel[name] for name in feature_names(features)}
+
+
+# === DataFrame Front End ===
+INPUT_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+def stack(frames, columns):
+    # list of DataFrames -> {column: (S, T)} right-aligned, NaN-padded on the left
+    width = max((len(df) for df in frames), default=0)
+    arrays = {}
+    for col in columns:
+        out = np.full((len(frames), width), np.nan)
+        for i, df in enumerate(frames):
+            if len(df):
+                out[i, width - len(df):] = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+        arrays[col] = out
+    return arrays
+
+def add_indicators_many(frames, features, suffix=""):
+    # {symbol: df} -> {symbol: df copy with indicator columns}, one vectorized pass
+    if not frames:
+        return {}
+    symbols = list(frames)
+    dfs = [frames[s] for s in symbols]
+    columns = [c for c in INPUT_COLUMNS if all(c in df.columns for df in dfs)] if dfs else []
+    values = compute(stack(dfs, columns), features)
+    width = max((len(df) for df in dfs), default=0)
+    out = {}
+    for i, (symbol, df) in enumerate(zip(symbols, dfs)):
+        df = df.copy()
+        for col in columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        start = width - len(df)
+        for name, arr in values.items():
+            df[name + suffix] = arr[i, start:]
+        out[symbol] = df
+    return out
+
+def add_indicators(df, features, suffix=""):
+    return add_indicators_many({None: df}, features, suffix)[None]
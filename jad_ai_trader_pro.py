@@ -1,77 +1,66 @@
 import pandas as pd
 import numpy as np
-import requests
 import time
+import sys
 from datetime import datetime
 from binance.client import Client
 from binance.exceptions import BinanceAPIException
 from binance_keys import API_KEY, API_SECRET
 from telegram_config import BOT_TOKEN, CHAT_ID
 import joblib
+from market_data import fetch_all
+from indicator_state import latest_indicators
+from kline_stream import KlineStream, open_source
+from sentiment_service import sentiment
+from resample import BASE_INTERVAL, BASE_DEPTH, CandleBuffer, derive_timeframes
+from batch_inference import missing_features, score_universe
+from exchange_info import ExchangeInfoCache
+from market_snapshot import MarketSnapshot
+from telegram_notifier import TelegramNotifier
+from cycle_metrics import METRICS_HOST, CycleMetrics
+from http_client import http
 
 # Binance + model setup
 client = Client(API_KEY, API_SECRET)
 model = joblib.load("intraday_ai_model.joblib")
+# Per-stage timings, API calls and errors: /metrics on 127.0.0.1:METRICS_PORT (--metrics-host to expose it),
+# one line per cycle in metrics_pro.jsonl
+METRICS_PORT = 9109
+metrics = CycleMetrics("pro")
+metrics.instrument_client(client)
+http.observers.append(metrics.observe_http)
+exchange_info = ExchangeInfoCache(client)
+snapshot = MarketSnapshot(client)
 CONFIDENCE_THRESHOLD = 75  # now at 75%
+TIMEFRAMES = ("1h", "15m", "5m")
+TF_FEATURES = ["rsi_14", "macd", "macd_signal", "volume_spike_%", "price_above_ema",
+               "atr", "momentum", "volatility", "normalized_volume"]
+indicator_states = {}
 
 # 30 top USDT coins, excluding stablecoins
 def get_top_usdt_symbols(limit=30):
     stablecoin_kw = {"BUSD","USDC","TUSD","FDUSD","DAI","SUSDT","TUSDT"}
-    tickers = client.get_ticker()
+    tickers = snapshot.ensure_fresh().tickers.values()
     usdt = [t for t in tickers
             if t["symbol"].endswith("USDT")
             and all(st not in t["symbol"][:-4] for st in stablecoin_kw)]
     usdt.sort(key=lambda x: float(x.get("quoteVolume",0)), reverse=True)
     return [t["symbol"] for t in usdt[:limit]]
 
-# Telegram alert helper
+# Telegram alert helper: queued for the cycle digest, sent off the trading thread
+notifier = TelegramNotifier(BOT_TOKEN, CHAT_ID)
+
 def send_telegram(msg):
-    try:
-        requests.post(
-            f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage",
-            data={"chat_id": CHAT_ID, "text": msg}
-        )
-    except:
-        pass
-
-# CryptoPanic sentiment (replace YOUR_CRYPTOPANIC_API_KEY)
+    notifier.notify(msg)
+
+# CryptoPanic sentiment, served from the shared TTL cache
 def get_news_sentiment(symbol):
-    try:
-        r = requests.get(
-          f"https://cryptopanic.com/api/v1/posts/?auth_token=YOUR_CRYPTOPANIC_API_KEY"
-          f"&currencies={symbol[:3].lower()}&public=true"
-        ).json()
-        s = 0; n=0
-        for item in r.get("results",[]):
-            if item.get("sentiment")=="positive": s+=1
-            elif item.get("sentiment")=="negative": s-=1
-            n+=1
-        return s/n if n else 0
-    except:
-        return 0
-
-# Indicator builder with suffix (_1h, _15m, _5m)
-def add_indicators(df, suffix=""):
-    df = df.copy()
-    df['rsi_14'+suffix] = (df['close'].diff().clip(lower=0)
-        .rolling(14).mean()
-      / df['close'].diff().abs().rolling(14).mean() * 100)
-    ema = df['close'].ewm(span=20,adjust=False).mean()
-    df['price_above_ema'+suffix] = (df['close']>ema).astype(int)
-    df['macd'+suffix] = df['close'].ewm(span=12).mean() - df['close'].ewm(span=26).mean()
-    df['macd_signal'+suffix] = df['macd'+suffix].ewm(span=9).mean()
-    df['volume_sma_8'+suffix] = df['volume'].rolling(8).mean()
-    df['volume_spike_%'+suffix] = ((df['volume'] - df['volume_sma_8'+suffix])
-                                  / df['volume_sma_8'+suffix])*100
-    df['atr'+suffix] = (df['high']-df['low']).rolling(14).mean()
-    df['momentum'+suffix] = df['close'] - df['close'].shift(5)
-    df['volatility'+suffix] = df['close'].rolling(14).std()
-    df['normalized_volume'+suffix] = df['volume']/df['volume'].rolling(14).mean()
-    return df.dropna()
+    return sentiment.get(symbol)
 
 # OHLCV fetcher
-def fetch_ohlcv(symbol, interval):
-    kl = client.get_klines(symbol=symbol, interval=interval, limit=100)
+def fetch_ohlcv(symbol, interval, limit=100):
+    with metrics.stage("fetch", symbol):
+        kl = client.get_klines(symbol=symbol, interval=interval, limit=limit)
     df = pd.DataFrame(kl,columns=[
         "time","open","high","low","close","volume","ct","qav","trades","tbv","tqv","ignore"
     ])
@@ -79,99 +68,136 @@ def fetch_ohlcv(symbol, interval):
     df["time"] = pd.to_datetime(df["time"],unit="ms")
     return df
 
+# 15m and 1h bars are aggregated locally from one rolling 5m buffer per symbol
+candle_buffer = CandleBuffer(fetch_ohlcv)
+
 # Main loop
-def run_signals():
-    print(f"\n📡 Jad’s AI Signal Engine — {datetime.now():%Y‑%m‑%d %H:%M}\n")
-    for sym in get_top_usdt_symbols():
-        print(f"🔎 Analyzing {sym}...")
+def run_signals(candles=None):
+    with metrics.cycle():
+        # alerts queued before an early return still go out this cycle
         try:
-            df1 = add_indicators(fetch_ohlcv(sym,"1h"), "_1h")
-            df15= add_indicators(fetch_ohlcv(sym,"15m"), "_15m")
-            df5 = add_indicators(fetch_ohlcv(sym,"5m"), "_5m")
-            sent = get_news_sentiment(sym)
-            if df1.empty or df15.empty or df5.empty:
-                continue
-
-            feat = {
-                # 1h
-                "rsi_14_1h": df1.iloc[-1]["rsi_14_1h"],
-                "macd_1h": df1.iloc[-1]["macd_1h"],
-                "macd_signal_1h": df1.iloc[-1]["macd_signal_1h"],
-                "volume_spike_%_1h": df1.iloc[-1]["volume_spike_%_1h"],
-                "price_above_ema_1h": df1.iloc[-1]["price_above_ema_1h"],
-                "atr_1h": df1.iloc[-1]["atr_1h"],
-                "momentum_1h": df1.iloc[-1]["momentum_1h"],
-                "volatility_1h": df1.iloc[-1]["volatility_1h"],
-                "normalized_volume_1h": df1.iloc[-1]["normalized_volume_1h"],
-                # 15m
-                "rsi_14_15m": df15.iloc[-1]["rsi_14_15m"],
-                "macd_15m": df15.iloc[-1]["macd_15m"],
-                "macd_signal_15m": df15.iloc[-1]["macd_signal_15m"],
-                "volume_spike_%_15m": df15.iloc[-1]["volume_spike_%_15m"],
-                "price_above_ema_15m": df15.iloc[-1]["price_above_ema_15m"],
-                "atr_15m": df15.iloc[-1]["atr_15m"],
-                "momentum_15m": df15.iloc[-1]["momentum_15m"],
-                "volatility_15m": df15.iloc[-1]["volatility_15m"],
-                "normalized_volume_15m": df15.iloc[-1]["normalized_volume_15m"],
-                # 5m
-                "rsi_14_5m": df5.iloc[-1]["rsi_14_5m"],
-                "macd_5m": df5.iloc[-1]["macd_5m"],
-                "macd_signal_5m": df5.iloc[-1]["macd_signal_5m"],
-                "volume_spike_%_5m": df5.iloc[-1]["volume_spike_%_5m"],
-                "price_above_ema_5m": df5.iloc[-1]["price_above_ema_5m"],
-                "atr_5m": df5.iloc[-1]["atr_5m"],
-                "momentum_5m": df5.iloc[-1]["momentum_5m"],
-                "volatility_5m": df5.iloc[-1]["volatility_5m"],
-                "normalized_volume_5m": df5.iloc[-1]["normalized_volume_5m"],
-                # sentiment
-                "news_sentiment": sent
-            }
-            X = pd.DataFrame([feat])
-            missing = [c for c in model.feature_names_in_ if c not in X.columns]
+            print(f"\n📡 Jad’s AI Signal Engine — {datetime.now():%Y‑%m‑%d %H:%M}\n")
+            with metrics.stage("snapshot"):
+                snapshot.refresh()
+                exchange_info.refresh_if_stale()   # keeps the bulk REST call off the order path
+            if candles is None:
+                symbols = get_top_usdt_symbols()
+                with metrics.stage("fetch"):
+                    candles = fetch_all(candle_buffer.update, symbols, intervals=(BASE_INTERVAL,))
+            else:
+                symbols = sorted({sym for sym, _ in candles})
+            with metrics.stage("resample"):
+                # closed 1h/15m buckets only, matching multi_tf_dataset's training features
+                candles = derive_timeframes(candles, TIMEFRAMES, include_open=False)
+            with metrics.stage("sentiment"):
+                sentiment.prefetch(symbols)
+            rows = {}
+            with metrics.stage("indicators"):
+                for sym in symbols:
+                    print(f"🔎 Analyzing {sym}...")
+                    try:
+                        with metrics.stage("indicators", sym):
+                            sent = get_news_sentiment(sym)
+                            # adjust=False EMAs, the same definition indicators.py uses for training
+                            states = {tf: latest_indicators(indicator_states, (sym, tf), candles[(sym, tf)],
+                                                            time_col="time", verify=TF_FEATURES)
+                                      for tf in TIMEFRAMES}
+                        if not all(state.ready(TF_FEATURES) for state in states.values()):
+                            continue
+
+                        feat = {f"{name}_{tf}": state.values[name]
+                                for tf, state in states.items() for name in TF_FEATURES}
+                        feat["news_sentiment"] = sent
+                        rows[sym] = feat
+                    except Exception as ex:
+                        print(f"❌ Feature error for {sym}: {ex}")
+
+            if not rows:
+                print("⚠️ Skipping cycle: no symbol has complete data")
+                return
+
+            missing = missing_features(model, rows)
             if missing:
-                print(f"⚠️ Skipping {sym}: Missing {missing}")
-                continue
-
-            p = model.predict_proba(X[model.feature_names_in_])[0]
-            buy_conf, sell_conf = p[2]*100, p[0]*100
-
-            # BUY
-            if buy_conf >= CONFIDENCE_THRESHOLD:
-                try:
-                    price = float(client.get_symbol_ticker(symbol=sym)['price'])
-                    amt = 20
-                    prec = 6
-                    qty = round(amt/price,prec)
-                    ord = client.order_market_buy(symbol=sym,quantity=qty)
-                    p_exec = float(ord['fills'][0]['price'])
-                    q_exec = ord['executedQty']
-                    msg = f"✅ BUY {sym} — Qty:{q_exec} @ {p_exec:.4f} — Conf:{buy_conf:.1f}%"
-                    print(msg); send_telegram(msg)
-                except BinanceAPIException as e:
-                    print(f"❌ Buy error for {sym}: {e.message}")
-
-            # SELL
-            elif sell_conf >= CONFIDENCE_THRESHOLD:
-                try:
-                    bal = float(client.get_asset_balance(asset=sym.replace("USDT",""))['free'])
-                    prec=6; qty=round(bal,prec)
-                    ord = client.order_market_sell(symbol=sym,quantity=qty)
-                    p_exec = float(ord['fills'][0]['price'])
-                    q_exec = ord['executedQty']
-                    msg = f"📤 SELL {sym} — Qty:{q_exec} @ {p_exec:.4f} — Conf:{sell_conf:.1f}%"
-                    print(msg); send_telegram(msg)
-                except BinanceAPIException as e:
-                    print(f"❌ Sell error for {sym}: {e.message}")
+                print(f"⚠️ Skipping cycle: Missing {missing}")
+                return
 
-            else:
-                print(f"[{sym}] → HOLD (Buy:{buy_conf:.1f}%, Sell:{sell_conf:.1f}%)")
+            try:
+                with metrics.stage("predict"):
+                    scores = score_universe(model, rows)
+            except Exception as ex:
+                print(f"❌ Prediction error: {ex}")
+                return
+
+            with metrics.stage("trade"):
+                for sym, p in scores.items():
+                    try:
+                        buy_conf, sell_conf = p[2]*100, p[0]*100
+
+                        # BUY
+                        if buy_conf >= CONFIDENCE_THRESHOLD:
+                            try:
+                                with metrics.stage("order", sym):
+                                    price = snapshot.price(sym)
+                                    amt = 20
+                                    qty = exchange_info.round_quantity(sym, amt/price)
+                                    if not exchange_info.is_tradable(sym, qty, price):
+                                        print(f"⚠️ Skipping BUY {sym}: Qty:{qty} below LOT_SIZE/MIN_NOTIONAL")
+                                        continue
+                                    ord = client.order_market_buy(symbol=sym,quantity=exchange_info.format_quantity(sym, qty))
+                                p_exec = float(ord['fills'][0]['price'])
+                                q_exec = ord['executedQty']
+                                msg = f"✅ BUY {sym} — Qty:{q_exec} @ {p_exec:.4f} — Conf:{buy_conf:.1f}%"
+                                print(msg); send_telegram(msg)
+                            except BinanceAPIException as e:
+                                print(f"❌ Buy error for {sym}: {e.message}")
+
+                        # SELL
+                        elif sell_conf >= CONFIDENCE_THRESHOLD:
+                            try:
+                                with metrics.stage("order", sym):
+                                    bal = float(client.get_asset_balance(asset=sym.replace("USDT",""))['free'])
+                                    qty = exchange_info.round_quantity(sym, bal)
+                                    price = snapshot.price(sym)
+                                    if not exchange_info.is_tradable(sym, qty, price):
+                                        print(f"⚠️ Skipping SELL {sym}: Qty:{qty} below LOT_SIZE/MIN_NOTIONAL")
+                                        continue
+                                    ord = client.order_market_sell(symbol=sym,quantity=exchange_info.format_quantity(sym, qty))
+                                p_exec = float(ord['fills'][0]['price'])
+                                q_exec = ord['executedQty']
+                                msg = f"📤 SELL {sym} — Qty:{q_exec} @ {p_exec:.4f} — Conf:{sell_conf:.1f}%"
+                                print(msg); send_telegram(msg)
+                            except BinanceAPIException as e:
+                                print(f"❌ Sell error for {sym}: {e.message}")
+
+                        else:
+                            print(f"[{sym}] → HOLD (Buy:{buy_conf:.1f}%, Sell:{sell_conf:.1f}%)")
+
+                    except Exception as ex:
+                        print(f"❌ Trade error for {sym}: {ex}")
+        finally:
+            with metrics.stage("telegram"):
+                notifier.flush()
+
+# Streaming mode: evaluate on every 5m close instead of sleeping
+def run_stream(replay=None, record_to=None):
+    symbols = get_top_usdt_symbols()
+    stream = KlineStream(symbols, run_signals, intervals=(BASE_INTERVAL,),
+                         time_col="time", depth=BASE_DEPTH)
+    if replay is None:
+        stream.seed(fetch_all(candle_buffer.update, symbols, intervals=(BASE_INTERVAL,)))
+    stream.run(open_source(replay, symbols, (BASE_INTERVAL,)), record_to=record_to)
 
-        except Exception as ex:
-            print(f"❌ Prediction error for {sym}: {ex}")
+def arg_value(flag):
+    return sys.argv[sys.argv.index(flag) + 1] if flag in sys.argv else None
 
 if __name__ == "__main__":
+    metrics.serve(int(arg_value("--metrics-port") or METRICS_PORT), arg_value("--metrics-host") or METRICS_HOST)
     # initial ping
-    send_telegram("🌀 Jad’s AI Bot launched successfully and awaiting next signal cycle...")
+    notifier.send("🌀 Jad’s AI Bot launched successfully and awaiting next signal cycle...")
+    if "--stream" in sys.argv:
+        # --replay <file.jsonl | tcp://host:port> runs offline; --record <file> captures a feed
+        run_stream(arg_value("--replay"), arg_value("--record"))
+        sys.exit(0)
     while True:
         run_signals()
         time.sleep(300)
@@ -0,0 +1,78 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# === Memory-Mapped Kline Arrays ===
+# kline_cache/{interval}/{symbol}.time.npy   int64 open times (ms)
+# kline_cache/{interval}/{symbol}.ohlcv.npy  float64 (n, 5) open/high/low/close/volume
+# kline_cache/index.json                     row counts and time ranges
+# Readers open them with mmap_mode="r", so backtests get NumPy views over the
+# page cache and parallel workers share the same physical pages.
+MMAP_DIR = "kline_cache"
+OHLCV_COLS = ["open", "high", "low", "close", "volume"]
+
+def _paths(symbol, interval, root=MMAP_DIR):
+    base = os.path.join(root, interval, symbol)
+    return base + ".time.npy", base + ".ohlcv.npy"
+
+def _index_path(root=MMAP_DIR):
+    return os.path.join(root, "index.json")
+
+def load_index(root=MMAP_DIR):
+    path = _index_path(root)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def _update_index(symbol, interval, times, requested=None, root=MMAP_DIR):
+    # requested: the (start_ms, end_ms) range that was downloaded; a symbol listed
+    # after its start (or with no bars at all) still covers that whole range
+    index = load_index(root)
+    index.setdefault(interval, {})[symbol] = {
+        "rows": int(len(times)),
+        "start": int(times[0]) if len(times) else None,
+        "end": int(times[-1]) if len(times) else None,
+        "requested": [int(requested[0]), int(requested[1])] if requested else None,
+    }
+    tmp = _index_path(root) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp, _index_path(root))
+
+def write_klines(symbol, interval, df, time_col="time", root=MMAP_DIR, requested=None):
+    time_path, ohlcv_path = _paths(symbol, interval, root)
+    os.makedirs(os.path.dirname(time_path), exist_ok=True)
+    df = df.sort_values(time_col)
+    times = pd.to_datetime(df[time_col]).to_numpy("datetime64[ms]").astype(np.int64)
+    ohlcv = np.ascontiguousarray(df[OHLCV_COLS].to_numpy(dtype=np.float64))
+    # write to temp files then swap in, so a reader never maps a half-written array
+    for path, arr in ((time_path, times), (ohlcv_path, ohlcv)):
+        with open(path + ".tmp", "wb") as f:
+            np.save(f, arr)
+        os.replace(path + ".tmp", path)
+    _update_index(symbol, interval, times, requested, root)
+
+def has_klines(symbol, interval, root=MMAP_DIR):
+    return all(os.path.exists(p) for p in _paths(symbol, interval, root))
+
+def open_klines(symbol, interval, start=None, end=None, root=MMAP_DIR):
+    # (times, ohlcv) read-only views; start/end slice by binary search, still without copying
+    time_path, ohlcv_path = _paths(symbol, interval, root)
+    times = np.load(time_path, mmap_mode="r")
+    ohlcv = np.load(ohlcv_path, mmap_mode="r")
+    lo = 0 if start is None else int(np.searchsorted(times, _to_ms(start), side="left"))
+    hi = len(times) if end is None else int(np.searchsorted(times, _to_ms(end), side="right"))
+    return times[lo:hi], ohlcv[lo:hi]
+
+def klines_frame(symbol, interval, start=None, end=None, time_col="time", root=MMAP_DIR):
+    # the float block stays a view of the mapped array; only the time column is materialised
+    times, ohlcv = open_klines(symbol, interval, start, end, root)
+    df = pd.DataFrame(ohlcv, columns=OHLCV_COLS, copy=False)
+    df.insert(0, time_col, pd.to_datetime(np.asarray(times), unit="ms"))
+    return df
+
+def _to_ms(value):
+    return int(pd.Timestamp(value).value // 10**6)
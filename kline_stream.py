@@ -0,0 +1,170 @@
+import json
+import queue
+import socket
+import time
+from collections import deque
+
+import pandas as pd
+
+# === Kline Stream ===
+# Keeps candle buffers current from Binance combined kline streams (or a local
+# replay feed) and calls on_close once per closed bar for the whole universe,
+# with candles shaped like market_data.fetch_all: {(symbol, interval): df}.
+
+def stream_names(symbols, intervals):
+    return [f"{s.lower()}@kline_{i}" for s in symbols for i in intervals]
+
+def parse_kline_message(msg):
+    if isinstance(msg, (bytes, str)):
+        msg = json.loads(msg)
+    data = msg.get("data", msg)
+    if data.get("e") != "kline":
+        return None
+    k = data["k"]
+    return {
+        "symbol": k["s"],
+        "interval": k["i"],
+        "open_time": int(k["t"]),
+        "open": float(k["o"]),
+        "high": float(k["h"]),
+        "low": float(k["l"]),
+        "close": float(k["c"]),
+        "volume": float(k["v"]),
+        "closed": bool(k["x"]),
+    }
+
+
+class KlineStream:
+    def __init__(self, symbols, on_close, intervals=("1h",), trigger_interval=None,
+                 time_col="timestamp", depth=100, grace_seconds=10):
+        self.symbols = list(symbols)
+        self.intervals = list(intervals)
+        self.trigger_interval = trigger_interval or self.intervals[0]
+        self.on_close = on_close
+        self.time_col = time_col
+        self.grace_seconds = grace_seconds
+        self.buffers = {(s, i): deque(maxlen=depth) for s in self.symbols for i in self.intervals}
+        self.pending = {}  # open_time -> (first_seen, {symbols closed})
+
+    # === Buffers ===
+    def seed(self, candles):
+        # candles: {(symbol, interval): df} from a REST warm-up fetch
+        for key, df in candles.items():
+            if df is None or key not in self.buffers:
+                continue
+            buf = self.buffers[key]
+            buf.clear()
+            for row in df.to_dict("records"):
+                buf.append({
+                    "open_time": int(pd.Timestamp(row[self.time_col]).value // 10**6),
+                    "open": float(row.get("open", row["close"])),
+                    "high": float(row.get("high", row["close"])),
+                    "low": float(row.get("low", row["close"])),
+                    "close": float(row["close"]),
+                    "volume": float(row["volume"]),
+                })
+
+    def frame(self, symbol, interval, until=None):
+        # until: last open_time (ms) to include, so a bar opened after it is left out
+        rows = [c for c in self.buffers[(symbol, interval)] if until is None or c["open_time"] <= until]
+        df = pd.DataFrame(rows,
+                          columns=["open_time", "open", "high", "low", "close", "volume"])
+        df.insert(0, self.time_col, pd.to_datetime(df.pop("open_time"), unit="ms"))
+        return df
+
+    def _store(self, bar):
+        buf = self.buffers.get((bar["symbol"], bar["interval"]))
+        if buf is None:
+            return False
+        candle = {k: bar[k] for k in ("open_time", "open", "high", "low", "close", "volume")}
+        if buf and buf[-1]["open_time"] == candle["open_time"]:
+            buf[-1] = candle
+        elif not buf or buf[-1]["open_time"] < candle["open_time"]:
+            buf.append(candle)
+        return True
+
+    # === Close Dispatch ===
+    def _flush(self, open_time):
+        _, closed = self.pending.pop(open_time)
+        # the buffers may already hold the next, still-open bar; score only up to the closed one
+        candles = {(s, i): self.frame(s, i, until=open_time) for s in sorted(closed) for i in self.intervals}
+        try:
+            self.on_close(candles)
+        except Exception as e:
+            print("❌ Error in stream evaluation:", e)
+
+    def _flush_due(self, newest_open_time=None):
+        now = time.monotonic()
+        for open_time in sorted(self.pending):
+            first_seen, closed = self.pending[open_time]
+            if (len(closed) == len(self.symbols)
+                    or (newest_open_time is not None and open_time < newest_open_time)
+                    or now - first_seen >= self.grace_seconds):
+                self._flush(open_time)
+
+    def handle(self, msg):
+        bar = parse_kline_message(msg)
+        if bar is None or not self._store(bar):
+            return
+        if bar["interval"] != self.trigger_interval:
+            return
+        if bar["closed"]:
+            _, closed = self.pending.setdefault(bar["open_time"], (time.monotonic(), set()))
+            closed.add(bar["symbol"])
+        # only a later *closed* bar proves stragglers for an older bar are gone
+        self._flush_due(bar["open_time"] if bar["closed"] else None)
+
+    def run(self, source, record_to=None):
+        record = open(record_to, "a") if record_to else None
+        try:
+            for msg in source:
+                if record:
+                    record.write((msg.rstrip("\n") if isinstance(msg, str) else json.dumps(msg)) + "\n")
+                self.handle(msg)
+        finally:
+            if record:
+                record.close()
+            for open_time in sorted(self.pending):
+                self._flush(open_time)
+
+
+# === Feeds ===
+def binance_source(symbols, intervals):
+    from binance import ThreadedWebsocketManager
+    messages = queue.Queue()
+    twm = ThreadedWebsocketManager()
+    twm.start()
+    twm.start_multiplex_socket(callback=messages.put, streams=stream_names(symbols, intervals))
+    try:
+        while True:
+            msg = messages.get()
+            if msg.get("e") == "error":
+                print("❌ Stream error:", msg.get("m"))
+                continue
+            yield msg
+    finally:
+        twm.stop()
+
+def file_source(path, delay=0):
+    # replays a JSONL recording (one raw stream message per line)
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield line
+                if delay:
+                    time.sleep(delay)
+
+def socket_source(host, port):
+    # reads newline-delimited stream messages from a local TCP replay server
+    with socket.create_connection((host, port)) as conn:
+        for line in conn.makefile("r"):
+            if line.strip():
+                yield line
+
+def open_source(spec, symbols, intervals):
+    if spec is None:
+        return binance_source(symbols, intervals)
+    if spec.startswith("tcp://"):
+        host, port = spec[len("tcp://"):].rsplit(":", 1)
+        return socket_source(host, int(port))
+    return file_source(spec)
@@ -0,0 +1,123 @@
+import json
+import os
+import time
+
+import pandas as pd
+
+from bulk_download import BULK_WORKERS, download, fetch_page, klines_to_frame, pages, to_ms
+from ohlcv_store import load_frame, save_frame, store_path, TIME_COL
+from resample import INTERVAL_MS
+
+# === Incremental Kline Sync ===
+# Brings a stored series up to date by paging forward with startTime from the
+# last stored bar, optionally backfilling further into the past, and refetching
+# holes inside the stored range. Only closed bars are stored. Holes the exchange
+# has no data for (maintenance windows) are remembered so they aren't re-requested.
+DEFAULT_DEPTH = 1000  # bars fetched for a series we have never stored
+
+def fetch_range(symbol, interval, start_ms, end_ms=None):
+    now_ms = int(time.time() * 1000)
+    rows = []
+    for s, e in pages(interval, start_ms, to_ms(end_ms)):
+        rows.extend(fetch_page(symbol, interval, s, e))
+    return klines_to_frame(rows, TIME_COL, closed_before=now_ms)
+
+def find_gaps(times, interval):
+    # [(first_missing_ms, last_missing_ms)] between consecutive stored bars
+    ms = pd.to_datetime(times).astype("datetime64[ms]").astype("int64").to_numpy()
+    step = INTERVAL_MS[interval]
+    return [(int(a) + step, int(b) - step) for a, b in zip(ms[:-1], ms[1:]) if b - a > step]
+
+
+# === Known Gaps ===
+def _gaps_path(symbol, dataset):
+    return store_path(symbol, dataset).replace(".parquet", ".gaps.json")
+
+def _load_known_gaps(symbol, dataset):
+    path = _gaps_path(symbol, dataset)
+    if not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        return {tuple(g) for g in json.load(f)}
+
+def _save_known_gaps(symbol, dataset, gaps):
+    path = _gaps_path(symbol, dataset)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(sorted(gaps), f)
+
+
+# === Sync ===
+def plan_sync(symbol, interval, dataset, since=None):
+    # (existing frame or None, [(start_ms, end_ms, kind)]) with kind "new", "backfill" or "gap"
+    step = INTERVAL_MS[interval]
+    now_ms = int(time.time() * 1000)
+    existing = load_frame(symbol, dataset)
+    since_ms = None if since is None else to_ms(since)
+    if existing is None or existing.empty:
+        start_ms = since_ms if since_ms is not None else now_ms - DEFAULT_DEPTH * step
+        return None, [(start_ms, now_ms, "new")]
+
+    times = pd.to_datetime(existing[TIME_COL]).sort_values()
+    first_ms = to_ms(times.iloc[0])
+    last_ms = to_ms(times.iloc[-1])
+    ranges = [(last_ms + step, now_ms, "new")]
+    known = _load_known_gaps(symbol, dataset)
+    if since_ms is not None and since_ms < first_ms:
+        # history before listing is remembered like a gap; only ask for what's older than that
+        ends = {b: a for a, b in known}
+        empty_from = first_ms
+        while empty_from - step in ends:   # consecutive empty backfills chain backwards
+            empty_from = ends[empty_from - step]
+        if since_ms < empty_from:
+            ranges.append((since_ms, empty_from - step, "backfill"))
+    ranges += [(a, b, "gap") for a, b in find_gaps(times, interval) if (a, b) not in known]
+    return existing, ranges
+
+def apply_sync(symbol, interval, dataset, existing, fetched):
+    # fetched: [((start_ms, end_ms, kind), DataFrame)]; returns the number of bars added
+    known = _load_known_gaps(symbol, dataset)
+    before = set(known)
+    for (start_ms, end_ms, kind), df in fetched:
+        if kind in ("gap", "backfill") and df.empty:
+            known.add((start_ms, end_ms))
+        elif kind == "backfill" or (kind == "new" and existing is None):
+            # bars only start partway in (listing date): the empty prefix won't fill in later
+            first_ms = to_ms(pd.to_datetime(df[TIME_COL]).min()) if not df.empty else None
+            # (an unaligned start_ms alone leaves less than one bar before the first one)
+            if first_ms is not None and first_ms - INTERVAL_MS[interval] >= start_ms:
+                known.add((start_ms, first_ms - INTERVAL_MS[interval]))
+    if known != before:
+        _save_known_gaps(symbol, dataset, known)
+
+    new = pd.concat([df for _, df in fetched], ignore_index=True) if fetched else pd.DataFrame()
+    if new.empty:
+        return 0
+    if existing is not None:
+        new = pd.concat([existing[[TIME_COL, "open", "high", "low", "close", "volume"]], new], ignore_index=True)
+    new[TIME_COL] = pd.to_datetime(new[TIME_COL])
+    merged = new.drop_duplicates(TIME_COL, keep="last").sort_values(TIME_COL)
+    save_frame(symbol, dataset, merged)
+    return len(merged) - (0 if existing is None else len(existing))
+
+def sync_klines(symbol, interval, dataset=None, since=None):
+    dataset = dataset or interval
+    existing, ranges = plan_sync(symbol, interval, dataset, since)
+    fetched = [(r, fetch_range(symbol, interval, r[0], r[1])) for r in ranges]
+    return apply_sync(symbol, interval, dataset, existing, fetched)
+
+def sync_universe(symbols, interval, dataset=None, since=None, max_workers=BULK_WORKERS):
+    # every missing range of every symbol goes through one bulk download; returns
+    # {symbol: bars added, or None if a page failed and nothing was written}
+    dataset = dataset or interval
+    plans = {symbol: plan_sync(symbol, interval, dataset, since) for symbol in symbols}
+    jobs = [(symbol, interval, a, b) for symbol, (_, ranges) in plans.items() for a, b, _ in ranges]
+    results = download(jobs, TIME_COL, max_workers=max_workers)
+    added = {}
+    for symbol, (existing, ranges) in plans.items():
+        fetched = [(r, results[(symbol, interval, r[0], r[1])]) for r in ranges]
+        if any(df is None for _, df in fetched):
+            added[symbol] = None
+            continue
+        added[symbol] = apply_sync(symbol, interval, dataset, existing, fetched)
+    return added
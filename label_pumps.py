@@ -1,5 +1,10 @@
+import sys
+
 import pandas as pd
-import os
+import feature_cache
+import label_rules
+from label_rules import PUMP_RULES, label
+from parallel_runner import run_parallel
 
 symbols = [
     "BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "XRPUSDT",
@@ -8,48 +13,29 @@ symbols = [
 ]
 
 def label_pump_trades(df):
-    df["close"] = pd.to_numeric(df["close"], errors="coerce")
-    df["rsi_14"] = pd.to_numeric(df["rsi_14"], errors="coerce")
-    df["macd"] = pd.to_numeric(df["macd"], errors="coerce")
-    df["macd_signal"] = pd.to_numeric(df["macd_signal"], errors="coerce")
-    df["ema_20"] = pd.to_numeric(df["ema_20"], errors="coerce")
-    df["volume_spike_%"] = pd.to_numeric(df["volume_spike_%"], errors="coerce")
-
-    signals = []
-
-    for i in range(len(df)):
-        row = df.iloc[i]
-
-        # Entry condition
-        if (
-            row["rsi_14"] > 50 and
-            row["macd"] > row["macd_signal"] and
-            row["volume_spike_%"] > 30 and
-            row["close"] > row["ema_20"]
-        ):
-            signals.append(1)
-
-        # Exit condition
-        elif (
-            row["rsi_14"] < 60 or
-            row["macd"] < row["macd_signal"] or
-            row["volume_spike_%"] < 10 or
-            row["close"] < row["ema_20"]
-        ):
-            signals.append(-1)
-        else:
-            signals.append(0)
+    for col in ["close", "rsi_14", "macd", "macd_signal", "ema_20", "volume_spike_%"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
 
-    df["pump_label"] = signals
+    # entry (1) first, then exit (-1), else 0; see label_rules.PUMP_RULES
+    df["pump_label"] = label(df, PUMP_RULES)
     return df
 
-# Process each coin
-for symbol in symbols:
-    file = f"{symbol}_1h_indicators.csv"
-    if os.path.exists(file):
-        df = pd.read_csv(file, parse_dates=["timestamp"])
-        df = label_pump_trades(df)
-        df.to_csv(f"{symbol}_1h_labeled.csv", index=False)
-        print(f"✅ Labeled {symbol} for pump signals.")
-    else:
-        print(f"❌ File not found: {file}")
+# Labels are row-wise, so only bars appended since the last run need labeling
+# (no warm-up); --rebuild relabels everything
+CACHE_KEY = feature_cache.cache_key("1h_labeled", PUMP_RULES, sys.modules[__name__], label_rules)
+REBUILD = "--rebuild" in sys.argv
+
+# Process each coin on its own worker
+def label_symbol(symbol):
+    plan = feature_cache.plan(symbol, "1h_indicators", "1h_labeled", CACHE_KEY, REBUILD)
+    if plan is None:
+        return f"❌ No 1h indicators for {symbol}"
+    if plan.done:
+        return f"✔️ {symbol} labels up to date."
+    plan.save(label_pump_trades(plan.window(warmup=0)))
+    return f"✅ Labeled {symbol} for pump signals ({plan.new_rows} new bars)."
+
+if __name__ == "__main__":
+    for message in run_parallel(label_symbol, symbols, label="coins"):
+        if message:
+            print(message)
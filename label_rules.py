@@ -0,0 +1,128 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# === Rule-Based Labeler ===
+# Labeling schemes are written as ordered (label, rule) pairs, e.g.
+#   (1, "rsi_14 > 50 & macd > macd_signal & volume_spike_% > 30")
+# A rule is comparisons (> < >= <= == !=) between columns and numbers, joined by
+# & and | (& binds tighter) with parentheses. Each rule compiles once to a
+# function over column arrays returning a boolean mask; a scheme is one np.select,
+# so the first matching rule wins like an if/elif chain and unmatched rows get the
+# default. NaN compares False, exactly like the row-by-row Python comparisons.
+TOKEN = re.compile(r"\s*(?:(?P<num>-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)|(?P<op>>=|<=|==|!=|>|<|&|\||\(|\))|(?P<name>[A-Za-z_][\w%]*))")
+COMPARE = {">": np.greater, "<": np.less, ">=": np.greater_equal, "<=": np.less_equal,
+           "==": np.equal, "!=": np.not_equal}
+
+# label_pumps: pump entry, otherwise exit when any leg of the setup breaks
+PUMP_RULES = [
+    (1, "rsi_14 > 50 & macd > macd_signal & volume_spike_% > 30 & close > ema_20"),
+    (-1, "rsi_14 < 60 | macd < macd_signal | volume_spike_% < 10 | close < ema_20"),
+]
+
+def tokenize(text):
+    tokens, pos = [], 0
+    text = text.strip()
+    while pos < len(text):
+        match = TOKEN.match(text, pos)
+        if match is None or match.end() == pos:
+            raise ValueError(f"bad rule syntax at {text[pos:]!r} in {text!r}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        tokens.append((kind, float(value) if kind == "num" else value))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, text):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.pos = 0
+        self.columns = set()
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, value=None):
+        token = self.peek()
+        if token[0] is None or (value is not None and token[1] != value):
+            raise ValueError(f"expected {value or 'more input'} in rule {self.text!r}")
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self.any_of()
+        if self.pos != len(self.tokens):
+            raise ValueError(f"unexpected {self.peek()[1]!r} in rule {self.text!r}")
+        return node
+
+    def any_of(self):
+        parts = [self.all_of()]
+        while self.peek() == ("op", "|"):
+            self.take()
+            parts.append(self.all_of())
+        return parts[0] if len(parts) == 1 else (lambda cols: np.logical_or.reduce([p(cols) for p in parts]))
+
+    def all_of(self):
+        parts = [self.factor()]
+        while self.peek() == ("op", "&"):
+            self.take()
+            parts.append(self.factor())
+        return parts[0] if len(parts) == 1 else (lambda cols: np.logical_and.reduce([p(cols) for p in parts]))
+
+    def factor(self):
+        if self.peek() == ("op", "("):
+            self.take()
+            node = self.any_of()
+            self.take(")")
+            return node
+        left = self.operand()
+        kind, op = self.take()
+        if op not in COMPARE:
+            raise ValueError(f"expected a comparison, got {op!r} in rule {self.text!r}")
+        right = self.operand()
+        compare = COMPARE[op]
+        return lambda cols: compare(left(cols), right(cols))
+
+    def operand(self):
+        kind, value = self.take()
+        if kind == "num":
+            return lambda cols: value
+        if kind == "name":
+            self.columns.add(value)
+            return lambda cols: cols[value]
+        raise ValueError(f"expected a column or number, got {value!r} in rule {self.text!r}")
+
+
+def compile_rule(text):
+    # -> (mask function over {column: array}, set of referenced columns)
+    parser = _Parser(text)
+    return parser.parse(), parser.columns
+
+def compile_scheme(rules):
+    return [(value, *compile_rule(text)) for value, text in rules]
+
+def _columns(df, names):
+    missing = [name for name in names if name not in df.columns]
+    if missing:
+        raise KeyError(f"rule columns missing from frame: {missing}")
+    return {name: pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=float) for name in names}
+
+def apply_scheme(cols, scheme, rows, default=0):
+    if not scheme:
+        return np.full(rows, default)
+    masks = [np.broadcast_to(fn(cols), rows) for _, fn, _ in scheme]
+    return np.select(masks, [value for value, _, _ in scheme], default)
+
+def label(df, rules, default=0):
+    # one labeling scheme -> int array aligned with df
+    return label_many(df, {None: rules}, default)[None]
+
+def label_many(df, schemes, default=0):
+    # {name: rules} -> {name: labels}; each column is converted once for all schemes
+    compiled = {name: compile_scheme(rules) for name, rules in schemes.items()}
+    names = set().union(*(columns for scheme in compiled.values() for _, _, columns in scheme))
+    cols = _columns(df, sorted(names))
+    return {name: apply_scheme(cols, scheme, len(df), default).astype(int) for name, scheme in compiled.items()}
@@ -2,23 +2,40 @@ from binance.client import Client
 from binance.enums import *
 from binance.exceptions import BinanceAPIException
 from binance_keys import API_KEY, API_SECRET
+from cycle_metrics import METRICS_HOST, CycleMetrics
 client = Client(API_KEY, API_SECRET)
 
 from telegram_config import BOT_TOKEN, CHAT_ID
 
-import requests
+from http_client import http, BINANCE_API
 import pandas as pd
 import joblib
 import time
-import csv
-import os
-import json
+import sys
 from datetime import datetime
+from market_data import fetch_all
+from kline_stream import KlineStream, open_source
+from batch_inference import score_universe
+from exchange_info import ExchangeInfoCache
+from market_snapshot import MarketSnapshot
+from telegram_notifier import TelegramNotifier
+from pnl_ledger import load_ledger
+from state_store import StateStore
+from equity_tracker import EquityTracker, account_equity
+from indicator_state import latest_indicators
 
 print("🌀 Jad’s AI Bot launched successfully and awaiting next signal cycle...")
 
 model = joblib.load("intraday_ai_model.joblib")
 
+# Per-stage timings, API calls and errors: /metrics on 127.0.0.1:METRICS_PORT (--metrics-host to expose it),
+# one line per cycle in metrics_intraday.jsonl
+METRICS_PORT = 9108
+metrics = CycleMetrics("intraday")
+metrics.instrument_client(client)
+http.observers.append(metrics.observe_http)
+snapshot = MarketSnapshot(client)
+
 core_symbols = [
     "BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "XRPUSDT",
     "ADAUSDT", "AVAXUSDT", "DOTUSDT", "TONUSDT",
@@ -27,7 +44,7 @@ core_symbols = [
 
 def get_top_usdt_pairs(limit=15):
     try:
-        tickers = client.get_ticker()
+        tickers = snapshot.ensure_fresh().tickers.values()
         usdt_pairs = [t for t in tickers if t['symbol'].endswith("USDT") and not t['symbol'].startswith("LD")]
         sorted_pairs = sorted(usdt_pairs, key=lambda x: float(x['quoteVolume']), reverse=True)
         return [pair['symbol'] for pair in sorted_pairs if pair['symbol'] not in core_symbols][:limit]
@@ -35,129 +52,105 @@ def get_top_usdt_pairs(limit=15):
         print("❌ Failed to fetch USDT pairs:", e)
         return []
 
-positions_file = "positions.json"
+store = StateStore()
+exchange_info = ExchangeInfoCache(client)
+indicator_states = {}
+FEATURES = ["rsi_14", "macd", "macd_signal", "ema_20", "volume_spike_%"]
 
 # === Telegram Alert ===
+notifier = TelegramNotifier(BOT_TOKEN, CHAT_ID)
+
 def send_telegram(message):
+    # queued for this cycle's digest; sent off the trading thread
+    notifier.notify(message)
+
+# === Equity Tracking ===
+equity_tracker = EquityTracker()
+
+def snapshot_price(symbol):
+    ticker = snapshot.ticker(symbol)
+    return float(ticker["lastPrice"]) if ticker else None
+
+def track_equity():
     try:
-        url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
-        payload = {"chat_id": CHAT_ID, "text": message}
-        requests.post(url, data=payload)
+        balances = {
+            b["asset"]: float(b["free"]) + float(b["locked"])
+            for b in client.get_account()["balances"]
+            if float(b["free"]) + float(b["locked"]) > 0 and not b["asset"].startswith("LD")
+        }
+        equity, exposure = account_equity(balances, snapshot_price)
+        level = equity_tracker.update(equity, exposure)
+        store.record_equity(datetime.now(), equity, exposure, equity_tracker.summary()["peak"])
+        if level:
+            stats = equity_tracker.summary()
+            notifier.send(f"⚠️ Drawdown {stats['drawdown']:.1%} (passed {level:.0%}) | Equity ${equity:.2f} | Peak ${stats['peak']:.2f}")
     except Exception as e:
-        print("❌ Telegram error:", e)
+        print("❌ Equity tracking failed:", e)
 
 # === Trade Logger ===
-def log_trade(symbol, side, confidence, price, quantity, tag="core"):
-    filename = "executed_trades.csv"
-    file_exists = os.path.isfile(filename)
-    with open(filename, mode="a", newline="") as file:
-        writer = csv.writer(file)
-        if not file_exists:
-            writer.writerow(["Timestamp", "Symbol", "Side", "Confidence", "Price", "Quantity", "Tag"])
-        writer.writerow([datetime.now(), symbol, side, f"{confidence:.2f}%", price, quantity, tag])
-
-# === Daily PnL Summary ===
-def log_daily_pnl():
-    try:
-        df = pd.read_csv("executed_trades.csv", on_bad_lines='skip')
-        df["Timestamp"] = pd.to_datetime(df["Timestamp"])
-        df["Date"] = df["Timestamp"].dt.date
-        df["Price"] = pd.to_numeric(df["Price"])
-        df["Quantity"] = pd.to_numeric(df["Quantity"])
-
-        pnl_summary = []
-        for date, group in df.groupby("Date"):
-            profit = 0
-            buys = {}
-            for _, row in group.iterrows():
-                symbol = row["Symbol"]
-                if row["Side"] == "BUY":
-                    buys[symbol] = (row["Price"], row["Quantity"])
-                elif row["Side"] == "SELL" and symbol in buys:
-                    buy_price, qty = buys[symbol]
-                    sell_price = row["Price"]
-                    pnl = (sell_price - buy_price) * qty
-                    profit += pnl
-                    del buys[symbol]
-            pnl_summary.append([date, profit])
-
-        with open("daily_pnl_summary.csv", mode="w", newline="") as file:
-            writer = csv.writer(file)
-            writer.writerow(["Date", "Realized PnL (USD)"])
-            writer.writerows(pnl_summary)
-    except Exception as e:
-        print("❌ PnL log error:", e)
+# Realized PnL and daily_pnl_summary.csv are kept up to date per fill by the ledger
+ledger = load_ledger(store)
+
+def log_trade(symbol, side, confidence, price, quantity, tag="core", position=None):
+    timestamp = datetime.now()
+    # the fill and its position change commit together; the store is the trade history
+    store.record_fill(timestamp, symbol, side, price, quantity, confidence, tag, position)
+    ledger.record_fill(timestamp, symbol, side, price, quantity)
 
 # === Positions Tracker ===
 def load_positions():
-    if os.path.exists(positions_file):
-        with open(positions_file, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_positions(positions):
-    with open(positions_file, "w") as f:
-        json.dump(positions, f, indent=2)
-
-# === Precision Helper ===
-def get_quantity_precision(symbol):
-    try:
-        info = client.get_symbol_info(symbol)
-        for f in info["filters"]:
-            if f["filterType"] == "LOT_SIZE":
-                step = float(f["stepSize"])
-                return len(str(step).split(".")[-1].rstrip("0"))
-    except:
-        return 4
-    return 4
+    return store.load_positions()
 
 # === Liquidity Checkers ===
 def is_liquid(symbol, min_quote_volume=5000000, min_bid_ask_ratio=0.95):
     try:
-        book = client.get_order_book(symbol=symbol, limit=5)
-        ticker = client.get_ticker(symbol=symbol)
-        bid = float(book['bids'][0][0])
-        ask = float(book['asks'][0][0])
+        ticker = snapshot.ticker(symbol)
+        bid, ask = snapshot.book(symbol)
         quote_volume = float(ticker['quoteVolume'])
         spread_ratio = bid / ask if ask > 0 else 0
         return quote_volume >= min_quote_volume and spread_ratio >= min_bid_ask_ratio
     except:
+        metrics.error("liquidity", symbol)
         return False
 
 def can_exit_liquidly(symbol, quantity):
     try:
         order_book = client.get_order_book(symbol=symbol, limit=10)
         total_bid_value = sum(float(bid[0]) * float(bid[1]) for bid in order_book['bids'])
-        price = float(client.get_symbol_ticker(symbol=symbol)["price"])
+        price = snapshot.price(symbol)
         return total_bid_value >= price * quantity * 0.95
     except:
+        metrics.error("liquidity", symbol)
         return False
 
 # === Trade Execution ===
 def execute_trade(symbol, side, usdt_amount=None, fixed_quantity=None):
     try:
-        price = float(client.get_symbol_ticker(symbol=symbol)["price"])
-        precision = get_quantity_precision(symbol)
+        price = snapshot.price(symbol)
 
         if fixed_quantity is not None:
-            quantity = round(fixed_quantity, precision)
+            quantity = exchange_info.round_quantity(symbol, fixed_quantity)
         else:
-            quantity = round(usdt_amount / price, precision)
+            quantity = exchange_info.round_quantity(symbol, usdt_amount / price)
 
         if side == "SELL":
             asset = symbol.replace("USDT", "")
             balance = float(client.get_asset_balance(asset=asset)["free"])
-            quantity = min(quantity, balance)
-            quantity = round(quantity - 10**-precision, precision)
+            # flooring to the lot step keeps the order within the free balance
+            quantity = exchange_info.round_quantity(symbol, min(quantity, balance))
             if quantity <= 0:
                 print(f"⚠️ Skipping SELL: not enough balance for {symbol} (Have: {balance}, Need: {quantity})")
                 return None, None
 
+        if not exchange_info.is_tradable(symbol, quantity, price):
+            print(f"⚠️ Skipping {side} {symbol}: Qty={quantity} below LOT_SIZE/MIN_NOTIONAL")
+            return None, None
+
         order = client.create_order(
             symbol=symbol,
             side=SIDE_BUY if side == "BUY" else SIDE_SELL,
             type=ORDER_TYPE_MARKET,
-            quantity=quantity
+            quantity=exchange_info.format_quantity(symbol, quantity)
         )
 
         print(f"✅ {side} {symbol}: Qty={quantity}, Price={price:.4f}")
@@ -165,101 +158,125 @@ def execute_trade(symbol, side, usdt_amount=None, fixed_quantity=None):
 
     except BinanceAPIException as e:
         print(f"❌ Binance error: {e}")
+        metrics.error("order", symbol)
     except Exception as ex:
         print(f"❌ General error: {ex}")
+        metrics.error("order", symbol)
     return None, None
 
 # === Fetch Candles ===
-def fetch_ohlcv(symbol):
-    try:
-        url = f"https://api.binance.com/api/v3/klines?symbol={symbol}&interval=1h&limit=50"
-        response = requests.get(url)
-        if response.status_code != 200:
+def fetch_ohlcv(symbol, interval="1h"):
+    with metrics.stage("fetch", symbol):
+        try:
+            url = f"{BINANCE_API}/api/v3/klines?symbol={symbol}&interval={interval}&limit=50"
+            response = http.get(url, weight=2)
+            if response.status_code != 200:
+                return None
+            data = response.json()
+            df = pd.DataFrame(data, columns=[
+                "timestamp", "open", "high", "low", "close", "volume",
+                "close_time", "qav", "trades", "tbbav", "tbqav", "ignore"
+            ])
+            df["close"] = pd.to_numeric(df["close"])
+            df["volume"] = pd.to_numeric(df["volume"])
+            df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
+            return df[["timestamp", "close", "volume"]]
+        except:
+            metrics.error("fetch", symbol)
             return None
-        data = response.json()
-        df = pd.DataFrame(data, columns=[
-            "timestamp", "open", "high", "low", "close", "volume",
-            "close_time", "qav", "trades", "tbbav", "tbqav", "ignore"
-        ])
-        df["close"] = pd.to_numeric(df["close"])
-        df["volume"] = pd.to_numeric(df["volume"])
-        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
-        return df[["timestamp", "close", "volume"]]
-    except:
-        return None
-
-# === Add Indicators ===
-def add_indicators(df):
-    delta = df["close"].diff()
-    gain = delta.clip(lower=0)
-    loss = -delta.clip(upper=0)
-    avg_gain = gain.rolling(14).mean()
-    avg_loss = loss.rolling(14).mean()
-    rs = avg_gain / avg_loss
-    df["rsi_14"] = 100 - (100 / (1 + rs))
-    df["ema_20"] = df["close"].ewm(span=20, adjust=False).mean()
-    ema12 = df["close"].ewm(span=12, adjust=False).mean()
-    ema26 = df["close"].ewm(span=26, adjust=False).mean()
-    df["macd"] = ema12 - ema26
-    df["macd_signal"] = df["macd"].ewm(span=9, adjust=False).mean()
-    df["volume_sma_8"] = df["volume"].rolling(window=8).mean()
-    df["volume_spike_%"] = ((df["volume"] - df["volume_sma_8"]) / df["volume_sma_8"]) * 100
-    return df
 
 # === Run Prediction ===
-def run_prediction():
-    print("\n📡 Jad’s AI Signal Engine — Status\n")
-    positions = load_positions()
-    no_trades = True
+def run_prediction(candles=None):
+    with metrics.cycle():
+        print("\n📡 Jad’s AI Signal Engine — Status\n")
+        positions = load_positions()
+        no_trades = True
+        with metrics.stage("snapshot"):
+            snapshot.refresh()
+            exchange_info.refresh_if_stale()   # keeps the bulk REST call off the order path
+        if candles is None:
+            all_symbols = core_symbols + get_top_usdt_pairs()
+            with metrics.stage("fetch"):
+                candles = fetch_all(fetch_ohlcv, all_symbols)
+        else:
+            all_symbols = [symbol for symbol, _ in candles]
+
+        rows = {}
+        with metrics.stage("indicators"):
+            for symbol in all_symbols:
+                df = candles.get((symbol, "1h"))
+                if df is None or len(df) < 30:
+                    continue
+                with metrics.stage("indicators", symbol):
+                    state = latest_indicators(indicator_states, symbol, df, verify=FEATURES)
+                if state.ready(FEATURES):
+                    rows[symbol] = {name: state.values[name] for name in FEATURES}
+
+        with metrics.stage("predict"):
+            scores = score_universe(model, rows)
+
+        with metrics.stage("trade"):
+            for symbol, proba in scores.items():
+                buy_conf, sell_conf = proba[1] * 100, proba[0] * 100
+
+                if buy_conf >= 80 and symbol not in positions:
+                    with metrics.stage("liquidity", symbol):
+                        liquid = is_liquid(symbol)
+                    if liquid:
+                        with metrics.stage("order", symbol):
+                            price, qty = execute_trade(symbol, "BUY", usdt_amount=20)
+                        if price and qty:
+                            positions[symbol] = {
+                                "buy_price": price,
+                                "quantity": qty,
+                                "timestamp": str(datetime.now())
+                            }
+                            send_telegram(f"✅ BUY {symbol} @ {price:.4f} | Qty: {qty} | Conf: {buy_conf:.1f}%")
+                            log_trade(symbol, "BUY", buy_conf, price, qty, position=positions[symbol])
+                            no_trades = False
+
+                elif sell_conf >= 80 and symbol in positions:
+                    entry = positions[symbol]
+                    with metrics.stage("liquidity", symbol):
+                        liquid = can_exit_liquidly(symbol, entry["quantity"])
+                    if liquid:
+                        with metrics.stage("order", symbol):
+                            price, qty = execute_trade(symbol, "SELL", fixed_quantity=entry["quantity"])
+                        if price and qty:
+                            pnl = (price - entry["buy_price"]) * qty
+                            send_telegram(f"📤 SELL {symbol} @ {price:.4f} | PnL: ${pnl:.2f}")
+                            log_trade(symbol, "SELL", sell_conf, price, qty)
+                            del positions[symbol]
+                            no_trades = False
+
+                print(f"[{symbol}] → {'ENTER' if buy_conf >= 80 else 'EXIT'} (Buy: {buy_conf:.1f}%, Sell: {sell_conf:.1f}%)")
+
+
+        if no_trades:
+            send_telegram("📭 No trades this cycle. All signals HOLD or low confidence.")
+        with metrics.stage("equity"):
+            track_equity()
+        with metrics.stage("telegram"):
+            notifier.flush()
+
+# === Streaming Mode ===
+def run_stream(replay=None, record_to=None):
     all_symbols = core_symbols + get_top_usdt_pairs()
+    stream = KlineStream(all_symbols, run_prediction)
+    if replay is None:
+        stream.seed(fetch_all(fetch_ohlcv, all_symbols))
+    print(f"\n🌀 Streaming {len(all_symbols)} symbols — evaluating on every 1h close\n")
+    stream.run(open_source(replay, all_symbols, ["1h"]), record_to=record_to)
+
+def arg_value(flag):
+    return sys.argv[sys.argv.index(flag) + 1] if flag in sys.argv else None
+
+metrics.serve(int(arg_value("--metrics-port") or METRICS_PORT), arg_value("--metrics-host") or METRICS_HOST)
 
-    for symbol in all_symbols:
-        df = fetch_ohlcv(symbol)
-        if df is None or len(df) < 30:
-            continue
-        df = add_indicators(df).dropna()
-        latest = df.iloc[-1]
-        features = pd.DataFrame([{ 
-            "rsi_14": latest["rsi_14"],
-            "macd": latest["macd"],
-            "macd_signal": latest["macd_signal"],
-            "ema_20": latest["ema_20"],
-            "volume_spike_%": latest["volume_spike_%"]
-        }])
-
-        proba = model.predict_proba(features)[0]
-        buy_conf, sell_conf = proba[1] * 100, proba[0] * 100
-
-        if buy_conf >= 80 and symbol not in positions and is_liquid(symbol):
-            price, qty = execute_trade(symbol, "BUY", usdt_amount=20)
-            if price and qty:
-                positions[symbol] = {
-                    "buy_price": price,
-                    "quantity": qty,
-                    "timestamp": str(datetime.now())
-                }
-                send_telegram(f"✅ BUY {symbol} @ {price:.4f} | Qty: {qty} | Conf: {buy_conf:.1f}%")
-                log_trade(symbol, "BUY", buy_conf, price, qty)
-                no_trades = False
-
-        elif sell_conf >= 80 and symbol in positions:
-            entry = positions[symbol]
-            if can_exit_liquidly(symbol, entry["quantity"]):
-                price, qty = execute_trade(symbol, "SELL", fixed_quantity=entry["quantity"])
-                if price and qty:
-                    pnl = (price - entry["buy_price"]) * qty
-                    send_telegram(f"📤 SELL {symbol} @ {price:.4f} | PnL: ${pnl:.2f}")
-                    log_trade(symbol, "SELL", sell_conf, price, qty)
-                    del positions[symbol]
-                    no_trades = False
-
-        print(f"[{symbol}] → {'ENTER' if buy_conf >= 80 else 'EXIT'} (Buy: {buy_conf:.1f}%, Sell: {sell_conf:.1f}%)")
-
-    save_positions(positions)
-    log_daily_pnl()
-
-    if no_trades:
-        send_telegram("📭 No trades this cycle. All signals HOLD or low confidence.")
+if "--stream" in sys.argv:
+    # --replay <file.jsonl | tcp://host:port> runs offline; --record <file> captures a feed
+    run_stream(arg_value("--replay"), arg_value("--record"))
+    sys.exit(0)
 
 # === Main Loop ===
 print("\n🌀 Starting Jad’s AI Intraday Bot (Every 5 min)\n")
@@ -268,5 +285,6 @@ while True:
         run_prediction()
     except Exception as e:
         print("❌ Error in cycle:", e)
+        metrics.error("cycle")
     print(f"\n⏳ Waiting 5 minutes... ({time.ctime()})\n")
     time.sleep(300)
@@ -0,0 +1,22 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# === Concurrent Kline Fetcher ===
+# Runs every (symbol, interval) fetch of a cycle on a bounded thread pool so the
+# whole universe is ready in about one round trip instead of one per request.
+MAX_CONCURRENT_FETCHES = 10
+
+def fetch_all(fetch, symbols, intervals=("1h",), max_workers=MAX_CONCURRENT_FETCHES):
+    jobs = [(symbol, interval) for symbol in symbols for interval in intervals]
+    results = {}
+    if not jobs:
+        return results
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as pool:
+        futures = {pool.submit(fetch, symbol, interval): (symbol, interval) for symbol, interval in jobs}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                print(f"❌ Fetch failed for {key[0]} {key[1]}: {e}")
+                results[key] = None
+    return results
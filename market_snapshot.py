@@ -0,0 +1,51 @@
+import time
+
+# === Per-Cycle Market Snapshot ===
+# 24h tickers and best bid/ask for the whole exchange, fetched once per cycle in
+# two bulk calls and shared by universe selection, liquidity checks and orders.
+SNAPSHOT_MAX_AGE = 60   # seconds before universe/liquidity data is refetched
+PRICE_MAX_AGE = 10      # seconds before an order re-prices its symbol
+
+class MarketSnapshot:
+    def __init__(self, client, max_age=SNAPSHOT_MAX_AGE):
+        self.client = client
+        self.max_age = max_age
+        self.tickers = {}
+        self.books = {}
+        self.prices = {}
+        self.fetched_at = 0
+        self.price_times = {}
+
+    def refresh(self):
+        tickers = self.client.get_ticker()
+        books = self.client.get_orderbook_tickers()
+        now = time.time()
+        self.tickers = {t["symbol"]: t for t in tickers}
+        self.books = {b["symbol"]: (float(b["bidPrice"]), float(b["askPrice"])) for b in books}
+        self.prices = {s: float(t["lastPrice"]) for s, t in self.tickers.items()}
+        self.price_times = {}
+        self.fetched_at = now
+        return self
+
+    def age(self):
+        return time.time() - self.fetched_at
+
+    def ensure_fresh(self):
+        if self.age() > self.max_age:
+            self.refresh()
+        return self
+
+    # === Lookups ===
+    def ticker(self, symbol):
+        return self.ensure_fresh().tickers.get(symbol)
+
+    def book(self, symbol):
+        return self.ensure_fresh().books.get(symbol)
+
+    def price(self, symbol, max_age=PRICE_MAX_AGE):
+        # orders need a tighter bound than the cycle: refetch just this symbol if stale
+        fetched = self.price_times.get(symbol, self.fetched_at)
+        if symbol not in self.prices or time.time() - fetched > max_age:
+            self.prices[symbol] = float(self.client.get_symbol_ticker(symbol=symbol)["price"])
+            self.price_times[symbol] = time.time()
+        return self.prices[symbol]
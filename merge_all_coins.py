@@ -1,5 +1,5 @@
 import pandas as pd
-import os
+from ohlcv_store import load_frame
 
 # List of coins
 symbols = [
@@ -21,9 +21,8 @@ all_data = []
 
 # Process each coin
 for symbol in symbols:
-    file = f"{symbol}_indicators.csv"
-    if os.path.exists(file):
-        df = pd.read_csv(file, parse_dates=["timestamp"])
+    df = load_frame(symbol, "indicators")
+    if df is not None:
         df.rename(columns={"timestamp": "date"}, inplace=True)
 
         # Merge macro + sentiment
@@ -38,7 +37,7 @@ for symbol in symbols:
         all_data.append(df)
         print(f"✅ Merged {symbol}")
     else:
-        print(f"❌ Missing file: {file}")
+        print(f"❌ Missing indicators: {symbol}")
 
 # Concatenate all coins
 final = pd.concat(all_data, ignore_index=True)
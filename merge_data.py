@@ -1,7 +1,8 @@
 import pandas as pd
+from ohlcv_store import load_frame
 
 # Load BTC price
-btc = pd.read_csv("BTCUSDT_historical.csv", parse_dates=["timestamp"])
+btc = load_frame("BTCUSDT", "historical")
 btc.rename(columns={
     "timestamp": "date",
     "open": "btc_open",
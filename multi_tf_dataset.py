@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from indicators import FEATURE_SETS, add_indicators_many
+from resample import BASE_INTERVAL, INTERVAL_MS, resample_ohlcv
+
+# === Time-Aligned Multi-Timeframe Dataset ===
+# One row per (symbol, base bar). Each coarser timeframe is joined with a
+# backward as-of join on bar *close* time, so a 5m row only ever sees the last
+# 1h/15m bar that had already closed when the 5m bar closed; no lookahead.
+# The target is the next base bar's return, from a grouped shift.
+TIMEFRAMES = ("1h", "15m", "5m")
+FEATURES = FEATURE_SETS["multi_tf"]
+TARGET_THRESHOLD = 0.003   # +-0.3% next-bar move for the 1 / -1 classes
+
+def feature_columns(timeframes=TIMEFRAMES):
+    # the column order train_intraday_model.py expects
+    return [f"{name}_{tf}" for tf in timeframes for name in FEATURES]
+
+def _long_frame(frames, interval, time_col, keep=()):
+    parts = []
+    for symbol, df in frames.items():
+        part = df[[time_col, *keep, *FEATURES]].rename(columns={f: f"{f}_{interval}" for f in FEATURES})
+        part["symbol"] = symbol
+        parts.append(part)
+    out = pd.concat(parts, ignore_index=True)
+    out["available_at"] = out[time_col] + pd.Timedelta(milliseconds=INTERVAL_MS[interval])
+    return out.sort_values("available_at", kind="stable")
+
+def build_features(raw, timeframes=TIMEFRAMES, base_interval=BASE_INTERVAL, time_col="time"):
+    # raw {symbol: base-interval OHLCV} -> aligned feature frame with symbol, time and close
+    raw = {s: df for s, df in raw.items() if df is not None and not df.empty}
+    if not raw:
+        return pd.DataFrame(columns=["symbol", time_col, "close", *feature_columns(timeframes)])
+    per_tf = {}
+    for tf in timeframes:
+        frames = raw if tf == base_interval else {
+            s: resample_ohlcv(df, tf, base_interval, time_col, include_open=False) for s, df in raw.items()
+        }
+        per_tf[tf] = add_indicators_many(frames, FEATURES)
+
+    out = _long_frame(per_tf[base_interval], base_interval, time_col, keep=("close",))
+    for tf in timeframes:
+        if tf == base_interval:
+            continue
+        coarse = _long_frame(per_tf[tf], tf, time_col).drop(columns=time_col)
+        out = pd.merge_asof(out, coarse, on="available_at", by="symbol", direction="backward")
+    return out.drop(columns="available_at").sort_values(["symbol", time_col]).reset_index(drop=True)
+
+def add_target(df, threshold=TARGET_THRESHOLD):
+    # next base-bar return per symbol; the last bar of each symbol has no target
+    change = df.groupby("symbol")["close"].shift(-1) / df["close"] - 1
+    df = df.copy()
+    df["target"] = np.select([change > threshold, change < -threshold], [1.0, -1.0], 0.0)
+    df.loc[change.isna(), "target"] = np.nan
+    return df
+
+def build_dataset(raw, sentiment_by_symbol=None, timeframes=TIMEFRAMES, base_interval=BASE_INTERVAL,
+                  time_col="time", threshold=TARGET_THRESHOLD):
+    # complete rows only, in the training schema: features, news_sentiment, target
+    df = add_target(build_features(raw, timeframes, base_interval, time_col), threshold)
+    df["news_sentiment"] = df["symbol"].map(sentiment_by_symbol or {}).fillna(0)
+    df = df.dropna(subset=feature_columns(timeframes) + ["target"])
+    df["target"] = df["target"].astype(int)
+    return df[feature_columns(timeframes) + ["news_sentiment", "target"]].reset_index(drop=True)
+
+def build_chunk(job):
+    # process-pool entry point: job is ({symbol: raw df}, {symbol: sentiment})
+    raw, sentiments = job
+    return build_dataset(raw, sentiments)
@@ -0,0 +1,59 @@
+import os
+
+import pandas as pd
+
+# === Columnar OHLCV / Feature Store ===
+# One Parquet file per (dataset, symbol) under market_store/, with typed columns
+# and sorted timestamps so reads can project columns and prune row groups by
+# time range. Datasets keep the old CSV suffixes ("1h", "1h_indicators",
+# "1h_labeled", "historical", "indicators"); a missing Parquet file falls back to
+# the legacy {symbol}_{dataset}.csv so existing data keeps working until rewritten.
+STORE_DIR = "market_store"
+TIME_COL = "timestamp"
+ROW_GROUP_SIZE = 50_000
+
+def store_path(symbol, dataset):
+    return os.path.join(STORE_DIR, dataset, f"{symbol}.parquet")
+
+def legacy_csv_path(symbol, dataset):
+    return f"{symbol}_{dataset}.csv"
+
+def exists(symbol, dataset):
+    return os.path.exists(store_path(symbol, dataset)) or os.path.exists(legacy_csv_path(symbol, dataset))
+
+def _typed(df):
+    df = df.copy()
+    df[TIME_COL] = pd.to_datetime(df[TIME_COL])
+    for col in df.columns:
+        if col != TIME_COL and df[col].dtype == object:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df.sort_values(TIME_COL).reset_index(drop=True)
+
+def save_frame(symbol, dataset, df):
+    path = store_path(symbol, dataset)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    _typed(df).to_parquet(tmp, index=False, row_group_size=ROW_GROUP_SIZE)
+    os.replace(tmp, path)
+
+def load_frame(symbol, dataset, columns=None, start=None, end=None):
+    if columns is not None and TIME_COL not in columns:
+        columns = [TIME_COL] + list(columns)
+    path = store_path(symbol, dataset)
+    if os.path.exists(path):
+        filters = []
+        if start is not None:
+            filters.append((TIME_COL, ">=", pd.Timestamp(start)))
+        if end is not None:
+            filters.append((TIME_COL, "<=", pd.Timestamp(end)))
+        return pd.read_parquet(path, columns=columns, filters=filters or None)
+
+    legacy = legacy_csv_path(symbol, dataset)
+    if not os.path.exists(legacy):
+        return None
+    df = pd.read_csv(legacy, parse_dates=[TIME_COL], usecols=columns)
+    if start is not None:
+        df = df[df[TIME_COL] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df[TIME_COL] <= pd.Timestamp(end)]
+    return df.reset_index(drop=True)
@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# === Process-Pool Job Runner ===
+# Fans independent per-symbol jobs out over worker processes and hands results
+# back as they finish (on_result), while the returned list is always in job
+# order so outputs don't depend on which worker finished first. A failing job is
+# reported and yields None instead of aborting the run. Worker functions must be
+# importable (module level), and scripts using this need a __main__ guard.
+# Workers: --workers N, else PIPELINE_WORKERS, else one per core.
+
+def worker_count(workers=None):
+    if workers:
+        return int(workers)
+    if "--workers" in sys.argv:
+        return int(sys.argv[sys.argv.index("--workers") + 1])
+    return int(os.environ.get("PIPELINE_WORKERS", os.cpu_count() or 1))
+
+def chunks(items, parts):
+    # contiguous, order-preserving split into at most `parts` near-equal chunks
+    items = list(items)
+    parts = max(1, min(parts, len(items)))
+    size, extra = divmod(len(items), parts)
+    out, start = [], 0
+    for i in range(parts):
+        stop = start + size + (i < extra)
+        out.append(items[start:stop])
+        start = stop
+    return [c for c in out if c]
+
+def run_parallel(fn, jobs, workers=None, on_result=None, label="jobs"):
+    jobs = list(jobs)
+    workers = min(worker_count(workers), len(jobs)) if jobs else 1
+    results = [None] * len(jobs)
+    started = time.time()
+
+    def finish(i, result, done):
+        results[i] = result
+        if on_result is not None:
+            on_result(jobs[i], result)
+        print(f"⏱️ {done}/{len(jobs)} {label} done ({time.time() - started:.1f}s)")
+
+    if workers <= 1:
+        # no pool for a single worker: same code path, no pickling
+        for i, job in enumerate(jobs):
+            try:
+                result = fn(job)
+            except Exception as e:
+                print(f"❌ Job {job!r} failed: {e}")
+                result = None
+            finish(i, result, i + 1)
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fn, job): i for i, job in enumerate(jobs)}
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"❌ Job {jobs[i]!r} failed: {e}")
+                result = None
+            finish(i, result, done)
+    return results
@@ -0,0 +1,156 @@
+import csv
+import json
+import math
+import os
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+from fifo_ledger import daily_realized, match_fills
+from state_store import StateStore
+
+# === Incremental Realized-PnL Ledger ===
+# Updated per fill as trades are logged, matching sells against FIFO buy lots,
+# checkpointed to a small JSON file, and used to rewrite daily_pnl_summary.csv
+# without re-reading the fill history. Rebuilds replay the state store's fills
+# through the vectorized matcher in fifo_ledger, which applies the same FIFO rules.
+# `python pnl_ledger.py` verifies the checkpoint against a full replay of the
+# stored fills; `--rebuild` replaces it with the replay.
+CHECKPOINT_FILE = "pnl_checkpoint.json"
+SUMMARY_FILE = "daily_pnl_summary.csv"
+TURNOVER_TOL = 1e-14   # verify() abs tolerance per USD traded
+
+class PnlLedger:
+    def __init__(self, checkpoint_file=CHECKPOINT_FILE, summary_file=SUMMARY_FILE):
+        self.checkpoint_file = checkpoint_file
+        self.summary_file = summary_file
+        self.open_lots = {}   # symbol -> [[unit_cost, quantity], ...] oldest first
+        self.daily = {}       # "YYYY-MM-DD" -> realized PnL
+        self.fills = 0        # stored fills applied so far
+
+    # === Updates ===
+    def apply(self, timestamp, symbol, side, price, quantity, fee=0.0):
+        date = str(pd.Timestamp(timestamp).date())
+        self.daily.setdefault(date, 0.0)
+        price, quantity = float(price), float(quantity)
+        pnl = 0.0
+        if side == "BUY" and quantity > 0:
+            self.open_lots.setdefault(symbol, []).append([price + fee / quantity, quantity])
+        elif side == "SELL" and quantity > 0:
+            lots = self.open_lots.get(symbol, [])
+            left = quantity
+            while left > 1e-12 and lots:
+                take = min(left, lots[0][1])
+                pnl += take * (price - lots[0][0])
+                lots[0][1] -= take
+                left -= take
+                if lots[0][1] <= 1e-12:
+                    lots.pop(0)
+            # quantity beyond the logged inventory is unmatched and realizes nothing
+            pnl -= fee * (quantity - left) / quantity
+            if not lots:
+                self.open_lots.pop(symbol, None)
+            self.daily[date] += pnl
+        self.fills += 1
+        return date, pnl
+
+    def record_fill(self, timestamp, symbol, side, price, quantity, fee=0.0):
+        _, pnl = self.apply(timestamp, symbol, side, price, quantity, fee)
+        self.save()
+        self.write_summary()
+        return pnl
+
+    # === Persistence ===
+    def state(self):
+        return {"fills": self.fills, "open_lots": self.open_lots, "daily": self.daily}
+
+    def save(self):
+        tmp = self.checkpoint_file + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state(), f)
+        os.replace(tmp, self.checkpoint_file)
+
+    def write_summary(self):
+        tmp = self.summary_file + ".tmp"
+        with open(tmp, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Date", "Realized PnL (USD)"])
+            writer.writerows(sorted(self.daily.items()))
+        os.replace(tmp, self.summary_file)
+
+    @classmethod
+    def load(cls, checkpoint_file=CHECKPOINT_FILE, summary_file=SUMMARY_FILE):
+        ledger = cls(checkpoint_file, summary_file)
+        if os.path.exists(checkpoint_file):
+            with open(checkpoint_file) as f:
+                state = json.load(f)
+            if "open_lots" in state:   # last-buy checkpoints stay at fills=0 and get rebuilt
+                ledger.fills = state["fills"]
+                ledger.open_lots = state["open_lots"]
+                ledger.daily = state["daily"]
+        return ledger
+
+    @classmethod
+    def rebuild(cls, store, checkpoint_file=CHECKPOINT_FILE, summary_file=SUMMARY_FILE):
+        ledger = cls(checkpoint_file, summary_file)
+        fills = store.fills()[["timestamp", "symbol", "side", "price", "quantity"]]
+        if fills.empty:
+            return ledger
+        matched, lots = match_fills(fills)
+        daily = daily_realized(matched)
+        ledger.fills = len(fills)
+        ledger.daily = {str(d): float(p) for d, p in zip(daily["date"], daily["realized_pnl"])}
+        for symbol, group in lots.groupby("symbol", sort=False):
+            ledger.open_lots[symbol] = group[["unit_cost", "quantity"]].values.tolist()
+        return ledger
+
+
+def load_ledger(store):
+    # a crash between recording a fill and checkpointing it leaves the two out of step
+    ledger = PnlLedger.load()
+    if ledger.fills != store.fill_count():
+        print("⚠️ PnL checkpoint out of date, rebuilding from stored fills")
+        ledger = PnlLedger.rebuild(store)
+        ledger.save()
+        ledger.write_summary()
+    return ledger
+
+def verify(store, rel_tol=1e-9, abs_tol=1e-6):
+    # the vectorized matcher differences cumulative cost sums, so its rounding grows
+    # with total turnover rather than with each day's PnL; widen abs_tol with it
+    fills = store.fills()
+    abs_tol = max(abs_tol, TURNOVER_TOL * float((fills["price"] * fills["quantity"]).sum()))
+    def close(a, b):
+        return math.isclose(a, b, rel_tol=rel_tol, abs_tol=abs_tol)
+    current = PnlLedger.load().state()
+    replayed = PnlLedger.rebuild(store).state()
+    problems = []
+    if current["fills"] != replayed["fills"]:
+        problems.append(f"fills: checkpoint {current['fills']} vs store {replayed['fills']}")
+    for symbol in sorted(set(current["open_lots"]) | set(replayed["open_lots"])):
+        a, b = current["open_lots"].get(symbol, []), replayed["open_lots"].get(symbol, [])
+        if len(a) != len(b) or any(not close(x, y) for la, lb in zip(a, b) for x, y in zip(la, lb)):
+            problems.append(f"{symbol}: open lots differ")
+    for date in sorted(set(current["daily"]) | set(replayed["daily"])):
+        a, b = current["daily"].get(date), replayed["daily"].get(date)
+        if a is None or b is None or not close(a, b):
+            problems.append(f"{date}: checkpoint {a} vs store {b}")
+    return problems
+
+
+if __name__ == "__main__":
+    store = StateStore()
+    if "--rebuild" in sys.argv:
+        ledger = PnlLedger.rebuild(store)
+        ledger.save()
+        ledger.write_summary()
+        print(f"✅ Rebuilt PnL checkpoint from {ledger.fills} fills ({datetime.now():%Y-%m-%d %H:%M})")
+    else:
+        problems = verify(store)
+        if problems:
+            print("❌ PnL checkpoint does not match the stored fills:")
+            for p in problems:
+                print("  ", p)
+            sys.exit(1)
+        print("✅ PnL checkpoint matches the stored fills")
@@ -1,4 +1,4 @@
-import requests
+from http_client import http
 import pandas as pd
 from datetime import datetime, timedelta
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
@@ -15,7 +15,7 @@ def fetch_reddit_sentiment(subreddit="CryptoCurrency", days=60):
         before = int(datetime.combine(day + timedelta(days=1), datetime.min.time()).timestamp())
 
         url = f"https://api.pushshift.io/reddit/search/submission/?subreddit={subreddit}&after={after}&before={before}&size=100"
-        response = requests.get(url)
+        response = http.get(url)
         data = response.json().get('data', [])
 
         daily_scores = []
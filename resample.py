@@ -0,0 +1,73 @@
+import pandas as pd
+
+# === Local Timeframe Derivation ===
+# Fetch the finest interval once and aggregate 15m / 1h bars from it, so every
+# timeframe comes from the same candles and costs one REST call per symbol.
+BASE_INTERVAL = "5m"
+BASE_DEPTH = 1000  # 5m bars kept per symbol: ~83 hourly bars, enough for the 1h indicators
+
+INTERVAL_MS = {
+    "1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "1d": 86_400_000,
+}
+
+def resample_ohlcv(df, interval, base_interval=BASE_INTERVAL, time_col="time", include_open=True):
+    if df is None or df.empty:
+        return df
+    if interval == base_interval:
+        return df.reset_index(drop=True)
+    per_bucket = INTERVAL_MS[interval] // INTERVAL_MS[base_interval]
+    bucket = df[time_col].dt.floor(pd.Timedelta(milliseconds=INTERVAL_MS[interval]))
+    out = df.groupby(bucket, sort=True).agg(
+        open=("open", "first"), high=("high", "max"), low=("low", "min"),
+        close=("close", "last"), volume=("volume", "sum"), bars=("close", "size"),
+    )
+    # the buffer usually starts mid-bucket: that first bar is missing its opening trades
+    if out["bars"].iloc[0] < per_bucket:
+        out = out.iloc[1:]
+    # the last bucket is the still-open bar, exactly what REST returns as its final row
+    if not include_open and len(out) and out["bars"].iloc[-1] < per_bucket:
+        out = out.iloc[:-1]
+    return out.drop(columns="bars").reset_index()
+
+def derive_timeframes(candles, intervals, base_interval=BASE_INTERVAL, time_col="time", include_open=True):
+    # {(symbol, base_interval): df} -> same dict plus every requested coarser interval
+    # include_open=False keeps closed buckets only, as the multi-timeframe training set does
+    derived = dict(candles)
+    for (symbol, interval), df in candles.items():
+        if interval != base_interval:
+            continue
+        for target in intervals:
+            derived[(symbol, target)] = None if df is None else resample_ohlcv(df, target, base_interval, time_col, include_open)
+    return derived
+
+
+# === Rolling Base Buffer ===
+class CandleBuffer:
+    def __init__(self, fetch, base_interval=BASE_INTERVAL, depth=BASE_DEPTH, time_col="time"):
+        # fetch(symbol, interval, limit) -> DataFrame of base-interval candles
+        self.fetch = fetch
+        self.base_interval = base_interval
+        self.depth = depth
+        self.time_col = time_col
+        self.frames = {}
+
+    def update(self, symbol, interval=None):
+        current = self.frames.get(symbol)
+        if current is None or current.empty:
+            limit = self.depth
+        else:
+            # only the bars since our last one (which may still have been open)
+            elapsed = pd.Timestamp.now("UTC").tz_localize(None) - current[self.time_col].iloc[-1]
+            step = pd.Timedelta(milliseconds=INTERVAL_MS[self.base_interval])
+            limit = min(self.depth, int(elapsed / step) + 2)
+        fresh = self.fetch(symbol, self.base_interval, limit)
+        if fresh is None or fresh.empty:
+            return current
+        if current is not None and not current.empty and fresh[self.time_col].iloc[0] <= current[self.time_col].iloc[-1]:
+            merged = pd.concat([current[current[self.time_col] < fresh[self.time_col].iloc[0]], fresh])
+        else:
+            merged = fresh  # first fill, or a gap too wide to stitch
+        merged = merged.tail(self.depth).reset_index(drop=True)
+        self.frames[symbol] = merged
+        return merged
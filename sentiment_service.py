@@ -0,0 +1,127 @@
+import json
+import os
+import time
+
+from http_client import http
+
+# === News Sentiment Service ===
+# CryptoPanic scores cached per currency with a TTL. Missing currencies are
+# fetched in small comma-separated batches; a batch follows `next` pages (up to
+# MAX_PAGES) until every currency in it has posts, since one page is shared by
+# the whole batch. The cache file is merged before every fetch and save, so the
+# live bot and dataset builds share results while both are running. Failed fetches are remembered for FAILURE_TTL so a CryptoPanic
+# outage costs one timeout per batch, not one per symbol lookup.
+CRYPTOPANIC_URL = "https://cryptopanic.com/api/v1/posts/"
+CRYPTOPANIC_KEY = "YOUR_CRYPTOPANIC_API_KEY"
+SENTIMENT_TTL = 900
+FAILURE_TTL = 120
+BATCH_SIZE = 10
+MAX_PAGES = 5
+SENTIMENT_CACHE_FILE = "sentiment_cache.json"
+
+def currency_of(symbol):
+    return symbol[:-4] if symbol.endswith("USDT") else symbol
+
+def score_posts(posts):
+    # (positive - negative) / polarized posts; neutral posts don't dilute the score
+    score = count = 0
+    for item in posts:
+        s = item.get("sentiment")
+        if s == "positive": score += 1
+        if s == "negative": score -= 1
+        if s in ("positive", "negative"): count += 1
+    return score / count if count else 0
+
+
+class SentimentService:
+    def __init__(self, api_key=CRYPTOPANIC_KEY, ttl=SENTIMENT_TTL, cache_file=SENTIMENT_CACHE_FILE, batch_size=BATCH_SIZE):
+        self.api_key = api_key
+        self.ttl = ttl
+        self.cache_file = cache_file
+        self.batch_size = batch_size
+        self.cache = {}  # currency -> [score, fetched_at]
+        self.failed = {}  # currency -> failed_at, in memory only
+        self._merge_disk()
+
+    def _merge_disk(self):
+        # pick up scores another process (live bot / dataset build) fetched meanwhile;
+        # per currency the newer fetch wins
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file) as f:
+                disk = json.load(f)
+        except Exception:
+            return
+        for currency, entry in disk.items():
+            if currency not in self.cache or entry[1] > self.cache[currency][1]:
+                self.cache[currency] = entry
+
+    def _fresh(self, currency):
+        entry = self.cache.get(currency)
+        return entry is not None and time.time() - entry[1] < self.ttl
+
+    def _failed_recently(self, currency):
+        failed_at = self.failed.get(currency)
+        return failed_at is not None and time.time() - failed_at < FAILURE_TTL
+
+    def _fetch(self, currencies):
+        url, params = CRYPTOPANIC_URL, {
+            "auth_token": self.api_key,
+            "currencies": ",".join(c.lower() for c in currencies),
+            "public": "true",
+        }
+        posts = {c: [] for c in currencies}
+        for _ in range(MAX_PAGES):
+            resp = http.get(url, params=params)
+            if resp.status_code != 200:
+                # 401/429 error bodies have no results; don't cache them as neutral scores
+                raise RuntimeError(f"CryptoPanic HTTP {resp.status_code}")
+            data = resp.json()
+            for item in data.get("results", []):
+                for cur in item.get("currencies") or []:
+                    code = cur.get("code", "").upper()
+                    if code in posts:
+                        posts[code].append(item)
+            url, params = data.get("next"), None   # next carries the query string
+            if not url or all(posts.values()):
+                break
+        now = time.time()
+        for c in currencies:
+            self.cache[c] = [score_posts(posts[c]), now]
+            self.failed.pop(c, None)
+
+    def _save(self):
+        if not self.cache_file:
+            return
+        self._merge_disk()
+        tmp = self.cache_file + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.cache, f)
+        os.replace(tmp, self.cache_file)
+
+    def prefetch(self, symbols):
+        self._merge_disk()
+        stale = sorted({currency_of(s) for s in symbols
+                        if not self._fresh(currency_of(s)) and not self._failed_recently(currency_of(s))})
+        for i in range(0, len(stale), self.batch_size):
+            batch = stale[i:i + self.batch_size]
+            try:
+                self._fetch(batch)
+            except Exception as e:
+                print("❌ Sentiment fetch error:", e)
+                now = time.time()
+                self.failed.update((c, now) for c in batch)
+        if stale:
+            self._save()
+
+    def get(self, symbol):
+        currency = currency_of(symbol)
+        if not self._fresh(currency) and not self._failed_recently(currency):
+            self.prefetch([symbol])
+        # a stale score beats 0 while CryptoPanic is failing
+        entry = self.cache.get(currency)
+        return entry[0] if entry else 0
+
+
+sentiment = SentimentService()
@@ -0,0 +1,195 @@
+import csv
+import json
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+# === Transactional State Store ===
+# Positions, fills and equity in one SQLite database in WAL mode. A fill and the
+# position change it causes commit in the same transaction, so a kill mid-cycle
+# leaves either both or neither. The bot writes here; the PnL ledger and the
+# dashboard read fills and equity samples back from here. On first open the
+# legacy positions.json, executed_trades.csv and equity.json are imported.
+STATE_DB = "trader_state.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS positions (
+    symbol TEXT PRIMARY KEY,
+    buy_price REAL NOT NULL,
+    quantity REAL NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fills (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    date TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL,
+    confidence REAL,
+    price REAL NOT NULL,
+    quantity REAL NOT NULL,
+    tag TEXT
+);
+CREATE INDEX IF NOT EXISTS fills_symbol_time ON fills (symbol, timestamp);
+CREATE INDEX IF NOT EXISTS fills_date ON fills (date);
+CREATE TABLE IF NOT EXISTS equity (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS equity_samples (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    equity REAL NOT NULL,
+    exposure REAL
+);
+CREATE INDEX IF NOT EXISTS equity_samples_time ON equity_samples (timestamp);
+"""
+
+class StateStore:
+    def __init__(self, path=STATE_DB):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # NORMAL is durable across process crashes in WAL mode; only power loss can drop the last commit
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] == 0:
+            self.import_legacy()
+
+    def _transaction(self, statements, check=None):
+        # check(cursor) runs under the write lock; returning False rolls back without writing
+        with self.lock:
+            cur = self.conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                if check is not None and not check(cur):
+                    cur.execute("ROLLBACK")
+                    return False
+                for sql, args in statements:
+                    cur.execute(sql, args)
+                cur.execute("COMMIT")
+                return True
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+
+    # === Fills + Positions ===
+    def record_fill(self, timestamp, symbol, side, price, quantity, confidence=None, tag=None, position=None):
+        # BUY with a position opens/replaces it; SELL closes the symbol's position
+        ts = pd.Timestamp(timestamp)
+        statements = [(
+            "INSERT INTO fills (timestamp, date, symbol, side, confidence, price, quantity, tag) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (str(ts), str(ts.date()), symbol, side, confidence, float(price), float(quantity), tag),
+        )]
+        if side == "BUY" and position is not None:
+            statements.append((
+                "INSERT OR REPLACE INTO positions (symbol, buy_price, quantity, timestamp) VALUES (?, ?, ?, ?)",
+                (symbol, float(position["buy_price"]), float(position["quantity"]), str(position["timestamp"])),
+            ))
+        elif side == "SELL":
+            statements.append(("DELETE FROM positions WHERE symbol = ?", (symbol,)))
+        self._transaction(statements)
+
+    def load_positions(self):
+        with self.lock:
+            rows = self.conn.execute("SELECT symbol, buy_price, quantity, timestamp FROM positions").fetchall()
+        return {s: {"buy_price": p, "quantity": q, "timestamp": t} for s, p, q, t in rows}
+
+    def fills(self, symbol=None, start=None, end=None, after_id=None):
+        # after_id: only fills recorded after that row id, for tail readers
+        where, args = [], []
+        if after_id is not None:
+            where.append("id > ?"); args.append(int(after_id))
+        if symbol is not None:
+            where.append("symbol = ?"); args.append(symbol)
+        if start is not None:
+            where.append("date >= ?"); args.append(str(pd.Timestamp(start).date()))
+        if end is not None:
+            where.append("date <= ?"); args.append(str(pd.Timestamp(end).date()))
+        sql = "SELECT id, timestamp, symbol, side, confidence, price, quantity, tag FROM fills"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self.lock:
+            df = pd.read_sql_query(sql + " ORDER BY id", self.conn, params=args)
+        df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601")
+        return df
+
+    def fill_count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM fills").fetchone()[0]
+
+    # === Equity ===
+    def record_equity(self, timestamp, equity, exposure=None, peak=None):
+        # one sample for the curve plus the current last/peak, in one transaction
+        statements = [
+            ("INSERT INTO equity_samples (timestamp, equity, exposure) VALUES (?, ?, ?)",
+             (str(pd.Timestamp(timestamp)), float(equity), None if exposure is None else float(exposure))),
+            ("INSERT OR REPLACE INTO equity (key, value) VALUES ('last', ?)", (float(equity),)),
+        ]
+        if peak is not None:
+            statements.append(("INSERT OR REPLACE INTO equity (key, value) VALUES ('peak', ?)", (float(peak),)))
+        self._transaction(statements)
+
+    def get_equity(self):
+        # {"last": ..., "peak": ...}
+        with self.lock:
+            return dict(self.conn.execute("SELECT key, value FROM equity").fetchall())
+
+    def equity_history(self, start=None, end=None):
+        where, args = [], []
+        if start is not None:
+            where.append("timestamp >= ?"); args.append(str(pd.Timestamp(start)))
+        if end is not None:
+            where.append("timestamp <= ?"); args.append(str(pd.Timestamp(end)))
+        sql = "SELECT timestamp, equity, exposure FROM equity_samples"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self.lock:
+            df = pd.read_sql_query(sql + " ORDER BY timestamp", self.conn, params=args)
+        df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601")
+        return df
+
+    # === Legacy Import ===
+    def import_legacy(self, positions_file="positions.json", trades_file="executed_trades.csv", equity_file="equity.json"):
+        statements = []
+        if os.path.exists(trades_file):
+            with open(trades_file, newline="") as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                for row in reader:
+                    try:
+                        ts = pd.Timestamp(row[0])
+                        conf = float(row[3].rstrip("%")) if row[3] else None
+                        statements.append((
+                            "INSERT INTO fills (timestamp, date, symbol, side, confidence, price, quantity, tag) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            (str(ts), str(ts.date()), row[1], row[2], conf, float(row[4]), float(row[5]),
+                             row[6] if len(row) > 6 else None),
+                        ))
+                    except (IndexError, ValueError):
+                        continue
+        if os.path.exists(positions_file):
+            with open(positions_file) as f:
+                for symbol, p in json.load(f).items():
+                    statements.append((
+                        "INSERT OR REPLACE INTO positions (symbol, buy_price, quantity, timestamp) VALUES (?, ?, ?, ?)",
+                        (symbol, float(p["buy_price"]), float(p["quantity"]), str(p["timestamp"])),
+                    ))
+        if os.path.exists(equity_file):
+            with open(equity_file) as f:
+                legacy = json.load(f)
+            # only the old scalar keys; the equity tracker also keeps nested stats/ring data here
+            for key in ("peak", "last"):
+                value = legacy.get(key)
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    statements.append(("INSERT OR REPLACE INTO equity (key, value) VALUES (?, ?)", (key, float(value))))
+        # the version bump commits with the import, so a killed import is retried; it is
+        # re-read under the write lock so a bot and dashboard opening together import once
+        statements.append(("PRAGMA user_version = 1", ()))
+        def not_imported(cur):
+            return cur.execute("PRAGMA user_version").fetchone()[0] == 0
+        return self._transaction(statements, check=not_imported)
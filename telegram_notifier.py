@@ -0,0 +1,70 @@
+import queue
+import threading
+import time
+
+from http_client import http
+
+# === Background Telegram Notifier ===
+# notify() only appends to the current cycle's buffer; flush() hands the cycle's
+# messages to a worker thread as one digest, so Telegram latency never sits on
+# the order path. The worker spaces sends per chat and retries failures.
+TELEGRAM_MAX_LEN = 4096
+
+class TelegramNotifier:
+    def __init__(self, token, chat_id, max_queue=100, min_interval=1.0, retries=3):
+        self.url = f"https://api.telegram.org/bot{token}/sendMessage"
+        self.chat_id = chat_id
+        self.min_interval = min_interval
+        self.retries = retries
+        self.pending = []
+        self.lock = threading.Lock()
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.last_sent = 0
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+
+    def notify(self, message):
+        with self.lock:
+            self.pending.append(message)
+
+    def send(self, message):
+        # bypasses the digest, still off the calling thread
+        self._enqueue(message)
+
+    def flush(self):
+        with self.lock:
+            messages, self.pending = self.pending, []
+        if messages:
+            self._enqueue("\n".join(messages))
+
+    def close(self, timeout=10):
+        self.flush()
+        self.queue.put(None)
+        self.worker.join(timeout)
+
+    def _enqueue(self, text):
+        for i in range(0, len(text), TELEGRAM_MAX_LEN):
+            try:
+                self.queue.put_nowait(text[i:i + TELEGRAM_MAX_LEN])
+            except queue.Full:
+                print("⚠️ Telegram queue full, dropping message")
+
+    def _run(self):
+        while True:
+            text = self.queue.get()
+            if text is None:
+                return
+            wait = self.last_sent + self.min_interval - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            for attempt in range(self.retries):
+                try:
+                    # http_client already waits out 429 retry_after responses
+                    resp = http.post(self.url, data={"chat_id": self.chat_id, "text": text})
+                    if resp.status_code == 200:
+                        break
+                    print(f"❌ Telegram error: HTTP {resp.status_code}")
+                except Exception as e:
+                    print("❌ Telegram error:", e)
+                time.sleep(2 ** attempt)
+            self.last_sent = time.time()
@@ -1,4 +1,4 @@
-import requests
+from http_client import http
 
 BOT_TOKEN = "7960367964:AAE9_QQx1j44BTnk6v43J2HAvpBGYNzPG-g"
 CHAT_ID = "6747508723"  # Update if needed
@@ -7,7 +7,7 @@ message = "🚀 Telegram is working correctly!"
 
 url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
 payload = {"chat_id": CHAT_ID, "text": message}
-response = requests.post(url, data=payload)
+response = http.post(url, data=payload)
 
 print(response.text)
 